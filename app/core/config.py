@@ -1,9 +1,116 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = 120
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 120
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+DATABASE_ASYNC_URL = os.getenv("DATABASE_ASYNC_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DATABASE_REPLICA_ASYNC_URL = os.getenv("DATABASE_REPLICA_ASYNC_URL")
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+GRADING_URL_BASE = os.getenv("GRADING_URL_BASE", "http://127.0.0.1:8000")
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "2048"))
+QR_CACHE_DIR = os.getenv("QR_CACHE_DIR")
+
+GRADE_IMPORT_CHUNK_SIZE = int(os.getenv("GRADE_IMPORT_CHUNK_SIZE", "500"))
+GRADE_SYNC_MAX_SCANS = int(os.getenv("GRADE_SYNC_MAX_SCANS", "5000"))
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "labtrack-cache.sqlite"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "60"))
+
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+PHOTO_CACHE_SIZE = int(os.getenv("PHOTO_CACHE_SIZE", "512"))
+PHOTO_CACHE_TTL_SECONDS = int(os.getenv("PHOTO_CACHE_TTL_SECONDS", "300"))
+PHOTO_THUMBNAIL_SIZES = tuple(int(size) for size in os.getenv("PHOTO_THUMBNAIL_SIZES", "64,128,256").split(","))
+
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "memory")
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", os.path.join(tempfile.gettempdir(), "labtrack-events.sqlite"))
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "64"))
+EVENT_RETENTION = int(os.getenv("EVENT_RETENTION", "10000"))
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+EVENT_POLL_INTERVAL_SECONDS = float(os.getenv("EVENT_POLL_INTERVAL_SECONDS", "0.5"))
+EVENT_RETRY_MS = int(os.getenv("EVENT_RETRY_MS", "3000"))
+
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "0"))
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+QUERY_BUDGETS = {
+    route.strip(): int(budget)
+    for route, _, budget in (entry.rpartition("=") for entry in os.getenv("QUERY_BUDGETS", "").split(",") if entry)
+}
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", str(min(DB_POOL_SIZE, 5))))
+WARMUP_IMPORTS = tuple(module for module in os.getenv("WARMUP_IMPORTS", "qrcode,PIL.Image,numpy").split(",") if module)
+
+
+def _parse_rate_limits(value: str) -> dict:
+    limits = {}
+    for entry in filter(None, value.split(";")):
+        route, _, rules = entry.rpartition("=")
+        limits[route.strip()] = {}
+        for rule in rules.split(","):
+            scope, _, limit = rule.partition(":")
+            count, _, seconds = limit.partition("/")
+            limits[route.strip()][scope.strip()] = (int(count), float(seconds))
+    return limits
+
+
+RATE_LIMITS = _parse_rate_limits(os.getenv(
+    "RATE_LIMITS",
+    "POST /login=ip:600/60,user:10/60;POST /change-password=user:5/60;"
+    "GET /generate_qr/{lab_exercise_id}/{student_id}=ip:120/60"
+))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+ADMISSION_ROUTES = tuple(route.strip() for route in os.getenv(
+    "ADMISSION_ROUTES",
+    "POST /login,POST /change-password,GET /generate_qr/{lab_exercise_id}/{student_id},GET /users/{user_id}/photo"
+).split(",") if route.strip())
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", str(2 * (os.cpu_count() or 1))))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+
+QR_SHEET_WORKERS = int(os.getenv("QR_SHEET_WORKERS", "2"))
+QR_SHEET_CHUNK_SIZE = int(os.getenv("QR_SHEET_CHUNK_SIZE", "25"))
+QR_SHEET_MAX_ACTIVE_JOBS = int(os.getenv("QR_SHEET_MAX_ACTIVE_JOBS", "4"))
+QR_SHEET_JOB_TTL_SECONDS = int(os.getenv("QR_SHEET_JOB_TTL_SECONDS", "3600"))
+QR_SHEET_DIR = os.getenv("QR_SHEET_DIR")
+QR_SHEET_BACKEND = os.getenv("QR_SHEET_BACKEND", "memory")
+QR_SHEET_STORE_PATH = os.getenv("QR_SHEET_STORE_PATH", os.path.join(tempfile.gettempdir(), "labtrack-qr-sheets.sqlite"))
+
+TIMETABLE_SESSION_MINUTES = int(os.getenv("TIMETABLE_SESSION_MINUTES", "90"))
+TIMETABLE_FEED_TOKEN_DAYS = int(os.getenv("TIMETABLE_FEED_TOKEN_DAYS", "180"))
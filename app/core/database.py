@@ -1,16 +1,265 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.config import DATABASE_URL
+import logging
+import time
 
-engine = create_engine(DATABASE_URL)
+from fastapi import Header
+from jose import jwt, JWTError
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import DATABASE_URL, DATABASE_ASYNC, DATABASE_ASYNC_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, \
+    DB_POOL_TIMEOUT_SECONDS, DB_POOL_RECYCLE_SECONDS, DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS, \
+    DATABASE_REPLICA_URL, DATABASE_REPLICA_ASYNC_URL, READ_YOUR_WRITES_SECONDS, REPLICA_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def engine_options(url, is_async: bool = False) -> dict:
+    backend = make_url(url).get_backend_name()
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    )
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+_async_commit_hooks = []
+
+
+def after_async_commit(hook):
+    _async_commit_hooks.append(hook)
+    return hook
+
+
+class HookedAsyncSession(AsyncSession):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sync_session.info["async"] = True
+
+    async def commit(self):
+        await super().commit()
+        for hook in _async_commit_hooks:
+            await hook(self.sync_session)
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if DATABASE_ASYNC:
+    _async_database_url = DATABASE_ASYNC_URL or async_url(DATABASE_URL)
+    async_engine = create_async_engine(_async_database_url, **engine_options(_async_database_url, is_async=True))
+    AsyncSessionLocal = sessionmaker(async_engine, class_=HookedAsyncSession, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL))
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+else:
+    replica_engine = None
+    ReplicaSessionLocal = None
+
+if DATABASE_REPLICA_URL and DATABASE_ASYNC:
+    _async_replica_url = DATABASE_REPLICA_ASYNC_URL or async_url(DATABASE_REPLICA_URL)
+    replica_async_engine = create_async_engine(_async_replica_url,
+                                               **engine_options(_async_replica_url, is_async=True))
+    AsyncReplicaSessionLocal = sessionmaker(replica_async_engine, class_=HookedAsyncSession, autoflush=False,
+                                            expire_on_commit=False)
+else:
+    replica_async_engine = None
+    AsyncReplicaSessionLocal = None
+
 Base = declarative_base()
 
+
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def require_upsert_support(bind):
+    if bind.dialect.name not in UPSERT_INSERTS:
+        raise RuntimeError(f"LabTrack needs PostgreSQL or SQLite, got {bind.dialect.name}")
+
+
+def dialect_insert(db, table):
+    return UPSERT_INSERTS[db.bind.dialect.name](table)
+
+
+class ThreadedSession:
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def connection(self, **kwargs):
+        return await run_in_threadpool(self.sync_session.connection, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+recent_writers = LRUCache(maxsize=10000, ttl_seconds=READ_YOUR_WRITES_SECONDS)
+read_routing = {"replica": 0, "primary": 0, "fallback": 0}
+_replica_down_until = 0.0
+
+
+def _token_subject(authorization: str | None) -> str | None:
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        return jwt.get_unverified_claims(authorization.split("Bearer ")[1]).get("sub")
+    except JWTError:
+        return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_write_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    subject = session.info.get("subject")
+    if session.info.pop("wrote", False) and subject is not None:
+        recent_writers.set(subject, True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+def _async_session(async_factory, factory):
+    if async_factory is not None:
+        return async_factory()
+    return ThreadedSession(factory(expire_on_commit=False))
+
+
+async def _open_replica_session():
+    global _replica_down_until
+    if time.monotonic() < _replica_down_until:
+        read_routing["fallback"] += 1
+        return None
+
+    db = _async_session(AsyncReplicaSessionLocal, ReplicaSessionLocal)
+    try:
+        await db.connection()
+    except (DBAPIError, OSError) as e:
+        logger.warning("read replica unavailable, reading from the primary for %ss: %s", REPLICA_RETRY_SECONDS, e)
+        await db.close()
+        _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        read_routing["fallback"] += 1
+        return None
+
+    read_routing["replica"] += 1
+    db.sync_session.info["replica"] = True
+    return db
+
+
+def is_replica(db) -> bool:
+    return db.sync_session.info.get("replica", False)
+
+
+async def get_async_db(authorization: str | None = Header(None)):
+    db = _async_session(AsyncSessionLocal, SessionLocal)
+    db.sync_session.info["subject"] = _token_subject(authorization)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_read_db(authorization: str | None = Header(None)):
+    subject = _token_subject(authorization)
+    db = None
+    if replica_engine is not None:
+        if subject is not None and recent_writers.get(subject):
+            read_routing["primary"] += 1
+        else:
+            db = await _open_replica_session()
+
+    if db is None:
+        db = _async_session(AsyncSessionLocal, SessionLocal)
+        db.sync_session.info["subject"] = subject
+    try:
+        yield db
+    finally:
+        await db.close()
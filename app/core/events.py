@@ -0,0 +1,256 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import EVENT_BACKEND, EVENT_STORE_PATH, EVENT_BUFFER_SIZE, EVENT_RETENTION, EVENT_QUEUE_SIZE, \
+    EVENT_KEEPALIVE_SECONDS, EVENT_POLL_INTERVAL_SECONDS, EVENT_RETRY_MS
+
+
+class Event:
+    __slots__ = ("id", "topic", "data")
+
+    def __init__(self, id: int, topic: str, data: dict):
+        self.id = id
+        self.topic = topic
+        self.data = data
+
+
+class InProcessBackend:
+    shared = False
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._buffers = {}
+        self._evicted_through = {}
+
+    def append_many(self, items) -> list[Event]:
+        events = []
+        with self._lock:
+            for topic, data in items:
+                self._last_id += 1
+                event = Event(self._last_id, topic, data)
+                buffer = self._buffers.setdefault(topic, deque(maxlen=self.buffer_size))
+                if len(buffer) == buffer.maxlen:
+                    self._evicted_through[topic] = buffer[0].id
+                buffer.append(event)
+                events.append(event)
+        return events
+
+    def since(self, topic: str, after_id: int) -> list[Event] | None:
+        with self._lock:
+            if after_id > self._last_id or after_id < self._evicted_through.get(topic, 0):
+                return None
+            return [event for event in self._buffers.get(topic, ()) if event.id > after_id]
+
+
+class SqliteBackend:
+    shared = True
+
+    def __init__(self, path: str, retention: int):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT, data TEXT)"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS ix_events_topic_id ON events (topic, id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def append_many(self, items) -> list[Event]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            events = []
+            for topic, data in items:
+                cursor = connection.execute("INSERT INTO events (topic, data) VALUES (?, ?)", (topic, json.dumps(data)))
+                events.append(Event(cursor.lastrowid, topic, data))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._writes += len(events)
+        if self._writes >= 100:
+            self._writes = 0
+            connection.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (self.retention,))
+        return events
+
+    def last_id(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def since(self, topic: str, after_id: int) -> list[Event] | None:
+        connection = self._connection()
+        first_id, last_id = connection.execute("SELECT MIN(id), COALESCE(MAX(id), 0) FROM events").fetchone()
+        if after_id > last_id or (first_id is not None and after_id < first_id - 1):
+            return None
+        rows = connection.execute(
+            "SELECT id, data FROM events WHERE topic = ? AND id > ? ORDER BY id", (topic, after_id)
+        ).fetchall()
+        return [Event(event_id, topic, json.loads(data)) for event_id, data in rows]
+
+    def after(self, after_id: int) -> list[Event]:
+        rows = self._connection().execute(
+            "SELECT id, topic, data FROM events WHERE id > ? ORDER BY id", (after_id,)
+        ).fetchall()
+        return [Event(event_id, topic, json.loads(data)) for event_id, topic, data in rows]
+
+
+class Subscription:
+    __slots__ = ("topic", "queue", "lagged")
+
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+
+def _format(event: Event) -> str:
+    return f"id: {event.id}\nevent: {event.topic.split(':', 1)[0]}\ndata: {json.dumps(event.data)}\n\n"
+
+
+class EventBus:
+    def __init__(self, backend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._poller = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def publish_many(self, items) -> list[Event]:
+        if self.backend.shared:
+            events = await run_in_threadpool(self.backend.append_many, list(items))
+        else:
+            events = self.backend.append_many(items)
+        self.published += len(events)
+        if not self.backend.shared:
+            for event in events:
+                self._deliver(event)
+        return events
+
+    async def publish(self, topic: str, data: dict) -> Event:
+        return (await self.publish_many([(topic, data)]))[0]
+
+    def _deliver(self, event: Event):
+        for subscription in self._subscribers.get(event.topic, ()):
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscription.lagged = True
+                self.dropped += 1
+
+    def _needs_poller(self) -> bool:
+        return self.backend.shared and (self._poller is None or self._poller.done()
+                                        or self._poller.get_loop() is not asyncio.get_running_loop())
+
+    async def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(topic, self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(subscription)
+        if self._needs_poller():
+            last_id = await run_in_threadpool(self.backend.last_id)
+            if self._needs_poller():
+                self._poller = asyncio.create_task(self._poll(last_id))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    async def _poll(self, last_id: int):
+        while self._subscribers:
+            await asyncio.sleep(EVENT_POLL_INTERVAL_SECONDS)
+            for event in await run_in_threadpool(self.backend.after, last_id):
+                self._deliver(event)
+                last_id = event.id
+
+    async def _replay(self, topic: str, after_id: int):
+        if self.backend.shared:
+            return await run_in_threadpool(self.backend.since, topic, after_id)
+        return self.backend.since(topic, after_id)
+
+    async def stream(self, topic: str, last_event_id: int | None = None):
+        subscription = await self.subscribe(topic)
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            last_id = 0
+            replay_from = last_event_id
+            while True:
+                if replay_from is not None:
+                    events = await self._replay(topic, replay_from)
+                    replay_from = None
+                    if events is None:
+                        last_id = 0
+                        yield "event: reset\ndata: {}\n\n"
+                    else:
+                        for event in events:
+                            last_id = event.id
+                            yield _format(event)
+
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if subscription.lagged:
+                    subscription.lagged = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    replay_from = last_id
+                    continue
+
+                if event.id > last_id:
+                    last_id = event.id
+                    yield _format(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def create_backend():
+    if EVENT_BACKEND == "sqlite":
+        return SqliteBackend(EVENT_STORE_PATH, EVENT_RETENTION)
+    return InProcessBackend(EVENT_BUFFER_SIZE)
+
+
+event_bus = EventBus(create_backend(), EVENT_QUEUE_SIZE)
+
+
+def grade_topic(course_id: int, student_id: int) -> str:
+    return f"grade:{course_id}:{student_id}"
+
+
+async def publish_grades(course_id: int, lab_exercise_id: int, points_by_student: dict):
+    await event_bus.publish_many(
+        (grade_topic(course_id, student_id),
+         {"course_id": course_id, "lab_exercise_id": lab_exercise_id, "student_id": student_id, "points": points})
+        for student_id, points in points_by_student.items()
+    )
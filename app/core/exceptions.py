@@ -34,3 +34,96 @@ def raise_user_not_permitted():
         status_code=status.HTTP_403_FORBIDDEN,
         detail="User is not permitted to access this resource"
     )
+
+
+def raise_lab_exercise_not_found():
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Lab exercise not found"
+    )
+
+
+def raise_invalid_cursor():
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def raise_invalid_export_columns(columns):
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unknown export columns: {', '.join(columns)}"
+    )
+
+
+def raise_course_archived():
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Course is archived"
+    )
+
+
+def raise_rate_limited(retry_after: int):
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, retry later",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def raise_server_busy(retry_after: int):
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, retry later",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def raise_job_not_found():
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Job not found"
+    )
+
+
+def raise_job_not_ready(job_status: str):
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Job is {job_status}"
+    )
+
+
+def raise_student_not_enrolled():
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Student is not enrolled in this course"
+    )
+
+
+def raise_invalid_points(max_points: int):
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"points must be between 0 and {max_points}"
+    )
+
+
+def raise_invalid_idempotency_key():
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Idempotency-Key must be 1 to 100 characters"
+    )
+
+
+def raise_idempotency_key_reused():
+    raise HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Idempotency-Key was already used for a different request"
+    )
+
+
+def raise_too_many_scans(max_scans: int):
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload at most {max_scans} scans per request"
+    )
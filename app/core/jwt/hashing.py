@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, \
+    PASSWORD_HASH_MAX_CONCURRENCY
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphore = None
+_semaphore_loop = None
+
+
+class HashingMetrics:
+    def __init__(self):
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "executor": PASSWORD_HASH_EXECUTOR,
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_concurrency": PASSWORD_HASH_MAX_CONCURRENCY,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_ms": 1000 * self.total_wait_seconds / self.completed if self.completed else 0.0,
+            "avg_run_ms": 1000 * self.total_run_seconds / self.completed if self.completed else 0.0,
+            "max_run_ms": 1000 * self.max_run_seconds,
+        }
+
+
+metrics = HashingMetrics()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def bcrypt_cost(hashed_password: str) -> int | None:
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password) or bcrypt_cost(hashed_password) != BCRYPT_ROUNDS
+
+
+def get_hash_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if PASSWORD_HASH_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                               thread_name_prefix="password-hash")
+        return _executor
+
+
+def shutdown_hash_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_CONCURRENCY)
+        _semaphore_loop = loop
+    return _semaphore
+
+
+async def _run_hashing(fn, *args):
+    queued_at = time.perf_counter()
+    metrics.queued += 1
+    acquired = False
+    try:
+        async with _get_semaphore():
+            acquired = True
+            started_at = time.perf_counter()
+            metrics.queued -= 1
+            metrics.in_flight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(get_hash_executor(), fn, *args)
+            finally:
+                finished_at = time.perf_counter()
+                metrics.in_flight -= 1
+                metrics.completed += 1
+                metrics.total_wait_seconds += started_at - queued_at
+                metrics.total_run_seconds += finished_at - started_at
+                metrics.max_run_seconds = max(metrics.max_run_seconds, finished_at - started_at)
+    finally:
+        if not acquired:
+            metrics.queued -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
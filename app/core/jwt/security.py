@@ -2,15 +2,42 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException, status, Depends
 from jose import jwt, JWTError, ExpiredSignatureError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.core.database import get_db
+from app.core.cache import LRUCache
+from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, PRINCIPAL_CACHE_SIZE, \
+    PRINCIPAL_CACHE_TTL_SECONDS, TIMETABLE_FEED_TOKEN_DAYS
+from app.core.database import get_async_db
 from app.core.exceptions import raise_jwt_invalid_or_expired, raise_user_not_found
+from app.core.jwt.hashing import pwd_context, hash_password, verify_password, hash_password_async, \
+    verify_password_async, needs_rehash
 from app.models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+principal_cache = LRUCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+class Principal:
+    __slots__ = ("id", "username", "name", "surname", "role")
+
+    def __init__(self, id: int, username: str, name: str, surname: str, role: str):
+        self.id = id
+        self.username = username
+        self.name = name
+        self.surname = surname
+        self.role = role
+
+
+def invalidate_principal(username: str):
+    principal_cache.pop(username)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_change(mapper, connection, target):
+    invalidate_principal(target.username)
+    for previous_username in inspect(target).attrs.username.history.deleted:
+        invalidate_principal(previous_username)
 
 
 def create_access_token(data: dict, role: str) -> str:
@@ -20,6 +47,21 @@ def create_access_token(data: dict, role: str) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_feed_token(user_id: int) -> tuple[str, datetime]:
+    expire = datetime.now(timezone.utc) + timedelta(days=TIMETABLE_FEED_TOKEN_DAYS)
+    return jwt.encode({"timetable": user_id, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM), expire
+
+
+def verify_feed_token(token: str) -> int:
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("timetable")
+    except JWTError:
+        raise_jwt_invalid_or_expired()
+    if not isinstance(user_id, int):
+        raise_jwt_invalid_or_expired()
+    return user_id
+
+
 def verify_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -33,33 +75,51 @@ def verify_access_token(token: str) -> dict:
         raise_jwt_invalid_or_expired()
 
 
-from fastapi import Header
+from fastapi import Header, Query
 
 
-def get_current_user(authorization: str = Header(...), db: Session = Depends(get_db)):
+def _bearer_token(authorization: str) -> str:
     if not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization header format. Use 'Bearer <token>'."
         )
 
-    token = authorization.split("Bearer ")[1]
+    return authorization.split("Bearer ")[1]
+
+
+async def get_current_user(authorization: str = Header(...), db: AsyncSession = Depends(get_async_db)):
+    return await _principal_for_token(_bearer_token(authorization), db)
+
+
+async def get_stream_user(authorization: str | None = Header(None), access_token: str | None = Query(None),
+                          db: AsyncSession = Depends(get_async_db)):
+    if authorization is not None:
+        return await _principal_for_token(_bearer_token(authorization), db)
+    if access_token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token")
+
+    return await _principal_for_token(access_token, db)
+
+
+async def _principal_for_token(token: str, db: AsyncSession):
     payload = verify_access_token(token)
 
     username = payload.get("sub")
     if not username:
         raise_jwt_invalid_or_expired()
 
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise_user_not_found()
-
-    return user
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
 
+    row = (await db.execute(
+        select(User.id, User.username, User.name, User.surname, User.role)
+        .where(User.username == username)
+    )).first()
+    if not row:
+        raise_user_not_found()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    principal = Principal(*row)
+    principal_cache.set(username, principal)
+    return principal
@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from app.core.config import QUERY_BUDGET_DEFAULT, QUERY_BUDGET_MODE, QUERY_BUDGETS
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("route", "budget", "queries", "db_seconds", "started")
+
+    def __init__(self, route: str, budget: int):
+        self.route = route
+        self.budget = budget
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.started = None
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.queries = {}
+        self.db_seconds = {}
+        self.queries_per_request = {}
+        self.budget_exceeded = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries[key] = self.queries.get(key, 0) + stats.queries
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + stats.db_seconds
+            self.queries_per_request.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.queries)
+
+    def record_budget_exceeded(self, method: str, route: str):
+        with self._lock:
+            self.budget_exceeded[(method, route)] = self.budget_exceeded.get((method, route), 0) + 1
+
+    def reset(self):
+        with self._lock:
+            for series in (self.requests, self.latency, self.queries, self.db_seconds, self.queries_per_request,
+                           self.budget_exceeded):
+                series.clear()
+
+    def render(self, extra_counters: dict | None = None) -> str:
+        lines = []
+        with self._lock:
+            _counter(lines, "labtrack_http_requests_total", "HTTP requests by route and status.",
+                     {_labels(method=m, route=r, status=s): v for (m, r, s), v in self.requests.items()})
+            _histogram(lines, "labtrack_http_request_duration_seconds", "Request latency by route.", self.latency)
+            _counter(lines, "labtrack_db_queries_total", "SQL statements executed while serving a route.",
+                     {_labels(method=m, route=r): v for (m, r), v in self.queries.items()})
+            _counter(lines, "labtrack_db_query_duration_seconds_total", "Time spent in SQL statements by route.",
+                     {_labels(method=m, route=r): v for (m, r), v in self.db_seconds.items()})
+            _histogram(lines, "labtrack_db_queries_per_request", "SQL statements per request by route.",
+                       self.queries_per_request)
+            _counter(lines, "labtrack_db_query_budget_exceeded_total", "Requests that exceeded their query budget.",
+                     {_labels(method=m, route=r): v for (m, r), v in self.budget_exceeded.items()})
+        for name, (help_text, samples) in (extra_counters or {}).items():
+            _counter(lines, name, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines: list, name: str, help_text: str, samples: dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    lines.extend(f"{name}{labels} {_number(value)}" for labels, value in sorted(samples.items()))
+
+
+def _histogram(lines: list, name: str, help_text: str, histograms: dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+
+registry = Registry()
+
+
+def query_budget(method: str, route: str) -> int:
+    return QUERY_BUDGETS.get(f"{method} {route}", QUERY_BUDGET_DEFAULT)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.started = time.perf_counter()
+    if stats.budget and stats.queries > stats.budget and QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(f"{stats.route} exceeded its budget of {stats.budget} queries")
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is not None and stats.started is not None:
+        stats.db_seconds += time.perf_counter() - stats.started
+        stats.started = None
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope["app"], scope)
+        stats = RequestStats(route, query_budget(method, route))
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            registry.record(method, route, status, time.perf_counter() - started, stats)
+            if stats.budget and stats.queries > stats.budget:
+                registry.record_budget_exceeded(method, route)
+                logger.warning("%s %s ran %d queries (budget %d)", method, route, stats.queries, stats.budget)
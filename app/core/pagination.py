@@ -0,0 +1,41 @@
+import base64
+import json
+
+from fastapi import Response
+from sqlalchemy import func, or_, select
+
+from app.core.exceptions import raise_invalid_cursor
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(payload["id"])
+    except (ValueError, TypeError, KeyError):
+        raise_invalid_cursor()
+
+
+def prefix_filter(columns, prefix: str):
+    escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(*(func.lower(column).like(f"{escaped}%", escape="\\") for column in columns))
+
+
+async def count_rows(db, query) -> int:
+    return (await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))).scalar_one()
+
+
+async def fetch_page(db, query, id_column, after_id: int | None, limit: int, response: Response):
+    if after_id is not None:
+        query = query.where(id_column > after_id)
+
+    rows = (await db.execute(query.order_by(id_column).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    return rows
@@ -0,0 +1,68 @@
+import hashlib
+import io
+
+from sqlalchemy import event
+
+from app.core.cache import LRUCache
+from app.core.config import PHOTO_CACHE_SIZE, PHOTO_CACHE_TTL_SECONDS, PHOTO_THUMBNAIL_SIZES
+from app.models.user import User
+
+photo_cache = LRUCache(maxsize=PHOTO_CACHE_SIZE, ttl_seconds=PHOTO_CACHE_TTL_SECONDS)
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def photo_digest(photo: bytes) -> str:
+    return hashlib.sha256(photo).hexdigest()
+
+
+def sniff_media_type(photo: bytes) -> str | None:
+    for signature, media_type in IMAGE_SIGNATURES:
+        if photo.startswith(signature):
+            return media_type
+    if photo[:4] == b"RIFF" and photo[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def render_photo(photo: bytes, size: int | None) -> tuple[bytes, str] | None:
+    from PIL import UnidentifiedImageError
+
+    if size is None:
+        media_type = sniff_media_type(photo)
+        return None if media_type is None else (photo, media_type)
+
+    try:
+        return _thumbnail(photo, size)
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        return None
+
+
+def _thumbnail(photo: bytes, size: int) -> tuple[bytes, str]:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(photo)) as image:
+        image_format = image.format or "PNG"
+        thumbnail_format = "JPEG" if image_format == "JPEG" else "PNG"
+        thumbnail = image.convert("RGB") if thumbnail_format == "JPEG" else image.copy()
+        thumbnail.thumbnail((size, size))
+
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format=thumbnail_format, optimize=True)
+        return buffer.getvalue(), Image.MIME[thumbnail_format]
+
+
+def invalidate_photo(user_id: int):
+    for size in (None, *PHOTO_THUMBNAIL_SIZES):
+        photo_cache.pop((user_id, size))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_photo_on_change(mapper, connection, target):
+    invalidate_photo(target.id)
@@ -0,0 +1,125 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from app.core.cache import LRUCache
+from app.core.config import GRADING_URL_BASE, QR_CACHE_SIZE, QR_CACHE_DIR
+
+qr_cache = LRUCache(maxsize=QR_CACHE_SIZE)
+
+# Opened by the phone that scans a QR code: it submits POST /grade/{lab}/{student} with the stored token and asks
+# for a login first when there is none. URLs are relative so the page works behind any GRADING_URL_BASE prefix.
+SCAN_PAGE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>LabTrack grading</title>
+</head>
+<body>
+<p id="status">Recording grade...</p>
+<form id="login" hidden>
+<input name="username" placeholder="Username" autocomplete="username" required>
+<input name="password" type="password" placeholder="Password" autocomplete="current-password" required>
+<button>Log in</button>
+</form>
+<script>
+const [lab, student] = location.pathname.split("/").slice(-2);
+const status = document.getElementById("status");
+const form = document.getElementById("login");
+
+async function record() {
+  const token = localStorage.getItem("labtrack_token");
+  if (!token) { form.hidden = false; status.textContent = "Log in to record the grade."; return; }
+  const response = await fetch(`../../grade/${lab}/${student}`, {
+    method: "POST",
+    headers: {"Authorization": `Bearer ${token}`, "Content-Type": "application/json"},
+    body: "{}",
+  });
+  if (response.status === 401) { localStorage.removeItem("labtrack_token"); return record(); }
+  const body = await response.json();
+  status.textContent = response.ok
+    ? `Recorded: student ${body.student_id}, lab ${body.lab_exercise_id}, ${body.points} points.`
+    : body.detail || `Failed (${response.status}).`;
+}
+
+form.addEventListener("submit", async (event) => {
+  event.preventDefault();
+  const response = await fetch("../../login", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify(Object.fromEntries(new FormData(form))),
+  });
+  if (!response.ok) { status.textContent = "Invalid username or password."; return; }
+  localStorage.setItem("labtrack_token", (await response.json()).access_token);
+  form.hidden = true;
+  record();
+});
+
+record();
+</script>
+</body>
+</html>
+"""
+
+
+def grading_url(lab_exercise_id: int, student_id: int) -> str:
+    return f"{GRADING_URL_BASE.rstrip('/')}/scan/{lab_exercise_id}/{student_id}"
+
+
+def render_qr_png(data: str) -> bytes:
+    import qrcode
+
+    buffer = io.BytesIO()
+    qrcode.make(data).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _content_key(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(QR_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def _read_disk(key: str) -> bytes | None:
+    if not QR_CACHE_DIR:
+        return None
+    try:
+        with open(_disk_path(key), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_disk(key: str, png: bytes):
+    if not QR_CACHE_DIR:
+        return
+    path = _disk_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(png)
+    os.replace(tmp_path, path)
+
+
+def cached_qr_png(data: str) -> tuple[bytes, str] | None:
+    return qr_cache.get(_content_key(data))
+
+
+def get_qr_png(data: str) -> tuple[bytes, str]:
+    key = _content_key(data)
+    entry = qr_cache.get(key)
+    if entry is not None:
+        return entry
+
+    png = _read_disk(key)
+    if png is None:
+        png = render_qr_png(data)
+        _write_disk(key, png)
+
+    entry = (png, hashlib.sha256(png).hexdigest())
+    qr_cache.set(key, entry)
+    return entry
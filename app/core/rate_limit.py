@@ -0,0 +1,147 @@
+import asyncio
+import math
+import threading
+import time
+
+from fastapi import Request
+
+from app.core.cache import LRUCache
+from app.core.config import RATE_LIMITS, RATE_LIMIT_MAX_KEYS, TRUST_FORWARDED_FOR, ADMISSION_ROUTES, \
+    ADMISSION_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_SECONDS
+from app.core.exceptions import raise_rate_limited, raise_server_busy
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, period_seconds: float, maxsize: int):
+        self.capacity = capacity
+        self.refill_per_second = capacity / period_seconds
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, key) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+            if tokens >= 1:
+                self._buckets.set(key, (tokens - 1, now))
+                return 0.0
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.refill_per_second
+
+
+class AdmissionGate:
+    def __init__(self, concurrency: int, queue_size: int, timeout_seconds: float):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def acquire(self) -> str | None:
+        semaphore = self._get_semaphore()
+        if not semaphore.locked():
+            await semaphore.acquire()
+        elif self.waiting >= self.queue_size:
+            return "queue_full"
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class RejectionCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, route: str, reason: str):
+        with self._lock:
+            self.counts[(route, reason)] = self.counts.get((route, reason), 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+buckets = {
+    (route, scope): TokenBucket(count, seconds, RATE_LIMIT_MAX_KEYS)
+    for route, scopes in RATE_LIMITS.items()
+    for scope, (count, seconds) in scopes.items()
+}
+admission_gate = AdmissionGate(ADMISSION_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+rejections = RejectionCounter()
+
+
+def route_key(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route is not None else request.url.path}"
+
+
+def client_ip(request: Request) -> str:
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if TRUST_FORWARDED_FOR and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limit(request: Request, scope: str, key: str):
+    route = route_key(request)
+    bucket = buckets.get((route, scope))
+    if bucket is None:
+        return
+
+    retry_after = bucket.take(key)
+    if retry_after:
+        rejections.add(route, f"rate_limit_{scope}")
+        raise_rate_limited(math.ceil(retry_after))
+
+
+async def admission_control(request: Request):
+    enforce_rate_limit(request, "ip", client_ip(request))
+
+    route = route_key(request)
+    if route not in ADMISSION_ROUTES:
+        yield
+        return
+
+    rejected = await admission_gate.acquire()
+    if rejected:
+        rejections.add(route, rejected)
+        raise_server_busy(1)
+    try:
+        yield
+    finally:
+        admission_gate.release()
+
+
+def admission_stats() -> dict:
+    return {
+        "concurrency": admission_gate.concurrency,
+        "queue_size": admission_gate.queue_size,
+        "in_flight": admission_gate.in_flight,
+        "waiting": admission_gate.waiting,
+        "rejections": [
+            {"route": route, "reason": reason, "count": count}
+            for (route, reason), count in sorted(rejections.snapshot().items())
+        ],
+    }
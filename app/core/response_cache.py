@@ -0,0 +1,231 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE, READ_YOUR_WRITES_SECONDS
+from app.core.database import after_async_commit, is_replica
+from app.core.etag import etag_matches
+from app.core.serialization import render_json
+
+CACHED_HEADERS = ("x-next-cursor", "x-total-count")
+
+
+class InProcessStore:
+    blocking = False
+
+    def __init__(self, maxsize: int):
+        self.epoch = uuid.uuid4().hex
+        self._entries = LRUCache(maxsize=maxsize)
+        self._versions = {}
+        self._bumped_at = {}
+        self._lock = threading.Lock()
+
+    def versions(self, namespaces) -> tuple:
+        with self._lock:
+            return tuple(self._versions.get(namespace, 0) for namespace in namespaces)
+
+    def last_bump(self, namespaces) -> float:
+        with self._lock:
+            return max((self._bumped_at.get(namespace, 0.0) for namespace in namespaces), default=0.0)
+
+    def bump(self, namespaces):
+        now = time.time()
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+                self._bumped_at[namespace] = now
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def set(self, key: str, body: bytes, headers: dict):
+        self._entries.set(key, (body, headers))
+
+
+class SqliteStore:
+    blocking = True
+
+    def __init__(self, path: str, maxsize: int):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS versions (namespace TEXT PRIMARY KEY, version INTEGER)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, body BLOB, headers TEXT, stored_at REAL)"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS bumps (namespace TEXT PRIMARY KEY, bumped_at REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            connection.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('epoch', ?)", (uuid.uuid4().hex,))
+            self.epoch = connection.execute("SELECT value FROM meta WHERE name = 'epoch'").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def versions(self, namespaces) -> tuple:
+        placeholders = ",".join("?" * len(namespaces))
+        rows = dict(self._connection().execute(
+            f"SELECT namespace, version FROM versions WHERE namespace IN ({placeholders})", tuple(namespaces)
+        ).fetchall())
+        return tuple(rows.get(namespace, 0) for namespace in namespaces)
+
+    def last_bump(self, namespaces) -> float:
+        placeholders = ",".join("?" * len(namespaces))
+        return self._connection().execute(
+            f"SELECT MAX(bumped_at) FROM bumps WHERE namespace IN ({placeholders})", tuple(namespaces)
+        ).fetchone()[0] or 0.0
+
+    def bump(self, namespaces):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO versions (namespace, version) VALUES (?, 1) "
+                "ON CONFLICT(namespace) DO UPDATE SET version = version + 1",
+                [(namespace,) for namespace in namespaces],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO bumps (namespace, bumped_at) VALUES (?, ?)",
+                [(namespace, time.time()) for namespace in namespaces],
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, key: str):
+        row = self._connection().execute("SELECT body, headers FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def set(self, key: str, body: bytes, headers: dict):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, body, headers, stored_at) VALUES (?, ?, ?, ?)",
+            (key, body, json.dumps(headers), time.time()),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            connection.execute(
+                "DELETE FROM entries WHERE key NOT IN (SELECT key FROM entries ORDER BY stored_at DESC LIMIT ?)",
+                (self.maxsize,),
+            )
+
+
+class ResponseCache:
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.replica_skips = 0
+
+    def bump(self, *namespaces: str):
+        if namespaces:
+            self.store.bump(namespaces)
+
+    async def bump_async(self, *namespaces: str):
+        await self._call(self.bump, *namespaces)
+
+    async def _call(self, fn, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def respond(self, request: Request, namespaces: tuple, build, principal=None, db=None,
+                      cache_control: str = "private, max-age=0, must-revalidate",
+                      media_type: str = "application/json", render=render_json) -> Response:
+        query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+        versions = ",".join(map(str, await self._call(self.store.versions, namespaces)))
+        key = hashlib.sha256(
+            f"{request.url.path}?{query}|{principal}|{self.store.epoch}:{versions}".encode()
+        ).hexdigest()
+        headers = {"ETag": f'"{key}"', "Cache-Control": cache_control}
+
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        cached = await self._call(self.store.get, key)
+        if cached is not None:
+            self.hits += 1
+            body, cached_headers = cached
+            return Response(content=body, media_type=media_type, headers={**cached_headers, **headers})
+
+        self.misses += 1
+        build_response = Response()
+        content = await build(build_response)
+        extra_headers = {name: value for name, value in build_response.headers.items() if name in CACHED_HEADERS}
+        body = render(content)
+        if db is not None and is_replica(db) and \
+                time.time() - await self._call(self.store.last_bump, namespaces) < READ_YOUR_WRITES_SECONDS:
+            self.replica_skips += 1
+            return Response(content=body, media_type=media_type, headers={**extra_headers, "Cache-Control": "no-store"})
+        await self._call(self.store.set, key, body, extra_headers)
+        return Response(content=body, media_type=media_type, headers={**extra_headers, **headers})
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "replica_skips": self.replica_skips,
+        }
+
+
+def create_store():
+    if RESPONSE_CACHE_BACKEND == "sqlite":
+        return SqliteStore(RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE)
+    return InProcessStore(RESPONSE_CACHE_SIZE)
+
+
+response_cache = ResponseCache(create_store())
+_watched_models = []
+
+
+def invalidate_on_commit(models: tuple, namespaces):
+    _watched_models.append((models, namespaces))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_namespaces(session, flush_context):
+    changed = (*session.new, *session.dirty, *session.deleted)
+    for models, namespaces in _watched_models:
+        for instance in changed:
+            if isinstance(instance, models):
+                session.info.setdefault("cache_namespaces", set()).update(namespaces(instance))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_namespaces(session):
+    namespaces = session.info.pop("cache_namespaces", ())
+    if session.info.get("async"):
+        session.info.setdefault("committed_cache_namespaces", set()).update(namespaces)
+    else:
+        response_cache.bump(*namespaces)
+
+
+@after_async_commit
+async def _bump_committed_namespaces(session):
+    await response_cache.bump_async(*session.info.pop("committed_cache_namespaces", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_namespaces(session):
+    session.info.pop("cache_namespaces", None)
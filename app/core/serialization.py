@@ -0,0 +1,45 @@
+from operator import attrgetter
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import FAST_RESPONSES
+
+
+def _orjson_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def rows_to_dicts(rows, fields: tuple) -> list[dict]:
+    values = attrgetter(*fields)
+    if len(fields) == 1:
+        return [{fields[0]: values(row)} for row in rows]
+    return [dict(zip(fields, values(row))) for row in rows]
+
+
+def serialize_rows(rows, adapter: TypeAdapter, fields: tuple) -> list:
+    if FAST_RESPONSES:
+        return rows_to_dicts(rows, fields)
+    return adapter.validate_python(rows, from_attributes=True)
+
+
+def render_json(content) -> bytes:
+    if FAST_RESPONSES:
+        return orjson.dumps(content, default=_orjson_default)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def json_response(content, headers_from: Response | None = None):
+    headers = None
+    if headers_from is not None:
+        headers = {name: value for name, value in headers_from.headers.items()
+                   if name not in ("content-length", "content-type")}
+
+    if FAST_RESPONSES:
+        return ORJSONResponse(content, headers=headers)
+    return JSONResponse(jsonable_encoder(content), headers=headers)
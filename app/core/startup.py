@@ -0,0 +1,100 @@
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+
+import app.models  # noqa: F401
+import app.models.professor_courses  # noqa: F401
+from app.core.config import STARTUP_WARMUP, WARMUP_POOL_CONNECTIONS, WARMUP_IMPORTS, PASSWORD_HASH_WORKERS
+from app.core.database import engine, async_engine, replica_engine, replica_async_engine
+from app.core.jwt.hashing import get_hash_executor, shutdown_hash_executor, bcrypt_cost
+from app.services.qr_sheets import shutdown_qr_sheet_executor
+
+logger = logging.getLogger(__name__)
+
+
+def _prefill_pool(connections: int):
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def _prefill_async_pool(connections: int):
+    async def checkout():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(checkout() for _ in range(connections)))
+
+
+def _preload_modules():
+    for module in WARMUP_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            logger.warning("warm-up could not import %s", module)
+
+
+def _start_hash_workers():
+    executor = get_hash_executor()
+    for future in [executor.submit(bcrypt_cost, "") for _ in range(PASSWORD_HASH_WORKERS)]:
+        future.result()
+
+
+async def warm_up() -> dict:
+    timings = {}
+
+    def timed(step: str, started: float):
+        timings[step] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    configure_mappers()
+    timed("configure_mappers_ms", started)
+
+    started = time.perf_counter()
+    await run_in_threadpool(_prefill_pool, WARMUP_POOL_CONNECTIONS)
+    if async_engine is not None:
+        await _prefill_async_pool(WARMUP_POOL_CONNECTIONS)
+    timed("connection_pool_ms", started)
+
+    started = time.perf_counter()
+    await run_in_threadpool(_preload_modules)
+    timed("imports_ms", started)
+
+    started = time.perf_counter()
+    await run_in_threadpool(_start_hash_workers)
+    timed("hash_workers_ms", started)
+
+    logger.info("warm-up finished: %s", timings)
+    return timings
+
+
+async def shut_down():
+    shutdown_hash_executor()
+    shutdown_qr_sheet_executor()
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+    for database_engine in (async_engine, replica_async_engine):
+        if database_engine is not None:
+            await database_engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(application):
+    application.state.warm_up = await warm_up() if STARTUP_WARMUP else None
+    try:
+        yield
+    finally:
+        await shut_down()
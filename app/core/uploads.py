@@ -0,0 +1,22 @@
+import codecs
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+JSON_LINES_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+
+def media_type(content_type: str | None) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+async def iter_lines(stream):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
@@ -0,0 +1,37 @@
+from fastapi import Depends, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.core.database import engine, async_engine, replica_engine, replica_async_engine, require_upsert_support
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.rate_limit import admission_control
+from app.core.startup import lifespan
+from app.routers import auth, courses, grades, stats, students, users
+
+
+def create_app() -> FastAPI:
+    require_upsert_support(engine)
+
+    application = FastAPI(lifespan=lifespan, dependencies=[Depends(admission_control)])
+
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    application.add_middleware(MetricsMiddleware)
+
+    for database_engine in (engine, replica_engine):
+        if database_engine is not None:
+            instrument_engine(database_engine)
+    for database_engine in (async_engine, replica_async_engine):
+        if database_engine is not None:
+            instrument_engine(database_engine.sync_engine)
+
+    for module in (users, auth, courses, students, grades, stats):
+        application.include_router(module.router)
+    return application
+
+
+app = create_app()
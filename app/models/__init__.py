@@ -1,6 +1,9 @@
+from app.models.archive import ArchivedCourseAssignments, ArchivedLaboratoryExercise, ArchivedStudentPoints
 from app.models.course import Course
 from app.models.course_assignments import CourseAssignments
+from app.models.idempotency_key import IdempotencyKey
 from app.models.laboratory_exercise import LaboratoryExercise
+from app.models.student_course_totals import StudentCourseTotals
 from app.models.student_points import StudentPoints
 from app.models.time_details import TimeDetails
 from app.models.user import User
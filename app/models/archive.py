@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+
+from app.core.database import Base
+
+
+class ArchivedLaboratoryExercise(Base):
+    __tablename__ = "archived_laboratory_exercises"
+
+    id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    date_time = Column(DateTime, nullable=False)
+    max_points = Column(Integer, nullable=False)
+
+
+class ArchivedCourseAssignments(Base):
+    __tablename__ = "archived_course_assignments"
+
+    id = Column(Integer, primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
+    time_details_id = Column(Integer, ForeignKey("time_details.id", ondelete="CASCADE"), nullable=False)
+
+
+class ArchivedStudentPoints(Base):
+    __tablename__ = "archived_student_points"
+
+    id = Column(Integer, primary_key=True)
+    lab_exercise_id = Column(Integer, ForeignKey("archived_laboratory_exercises.id", ondelete="CASCADE"),
+                             nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    points = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_archived_student_points_lab_exercise_student", "lab_exercise_id", "student_id"),
+        Index("ix_archived_student_points_student", "student_id"),
+    )
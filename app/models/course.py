@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
@@ -9,6 +9,15 @@ class Course(Base):
     name = Column(String(255), nullable=False)
     code = Column(String(30), unique=True, nullable=False)
     semester = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=True)
 
     professor_courses = relationship("ProfessorCourses", back_populates="course", cascade="all, delete-orphan")
-    assignments = relationship("CourseAssignments", back_populates="course", cascade="all, delete-orphan")
\ No newline at end of file
+    assignments = relationship("CourseAssignments", back_populates="course", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_courses_semester_id", "semester", "id"),
+        Index("ix_courses_name_lower", func.lower(name).label("name_lower"),
+              postgresql_ops={"name_lower": "text_pattern_ops"}),
+        Index("ix_courses_code_lower", func.lower(code).label("code_lower"),
+              postgresql_ops={"code_lower": "text_pattern_ops"}),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -6,10 +6,15 @@ class CourseAssignments(Base):
     __tablename__ = "course_assignments"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
     time_details_id = Column(Integer, ForeignKey("time_details.id", ondelete="CASCADE"), nullable=False)
 
     student = relationship("User", backref="student_courses")
     course = relationship("Course", back_populates="assignments")
     time_details = relationship("TimeDetails", backref="student_courses")
+
+    __table_args__ = (
+        UniqueConstraint("course_id", "student_id", name="uq_course_assignments_course_student"),
+        {"sqlite_autoincrement": True},
+    )
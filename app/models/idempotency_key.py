@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
@@ -6,9 +6,11 @@ class LaboratoryExercise(Base):
     __tablename__ = "laboratory_exercises"
 
     id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     date_time = Column(DateTime, nullable=False)
     max_points = Column(Integer, nullable=False)
 
     course = relationship("Course", backref="laboratory_exercises")
+
+    __table_args__ = {"sqlite_autoincrement": True}
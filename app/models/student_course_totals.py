@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+class StudentCourseTotals(Base):
+    __tablename__ = "student_course_totals"
+
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    earned_points = Column(Integer, nullable=False, default=0)
+    max_points = Column(Integer, nullable=False, default=0)
+    graded_count = Column(Integer, nullable=False, default=0)
+
+    student = relationship("User")
+    course = relationship("Course")
+
+    __table_args__ = (Index("ix_student_course_totals_course_earned", "course_id", "earned_points"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -10,7 +10,13 @@ class StudentPoints(Base):
     lab_exercise_id = Column(Integer, ForeignKey("laboratory_exercises.id", ondelete="CASCADE"), nullable=False)
     student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     points = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
 
 
     lab_exercise = relationship("LaboratoryExercise", backref="student_points")
     student = relationship("User", backref="student_points")
+
+    __table_args__ = (
+        UniqueConstraint("lab_exercise_id", "student_id", name="uq_student_points_lab_exercise_student"),
+        {"sqlite_autoincrement": True},
+    )
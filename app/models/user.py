@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, LargeBinary
+from sqlalchemy import Column, Integer, String, LargeBinary, Index, func
 from app.core.database import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 class User(Base):
     __tablename__ = "users"
@@ -10,7 +10,16 @@ class User(Base):
     password = Column(String(60), nullable=False)
     name = Column(String(50), nullable=True)
     surname = Column(String(50), nullable=True)
-    role = Column(String(20), nullable=False)
-    photo = Column(LargeBinary, nullable=True)
+    role = Column(String(20), nullable=False, index=True)
+    photo = deferred(Column(LargeBinary, nullable=True))
 
     professor_courses = relationship("ProfessorCourses", back_populates="professor", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username).label("username_lower"),
+              postgresql_ops={"username_lower": "text_pattern_ops"}),
+        Index("ix_users_name_lower", func.lower(name).label("name_lower"),
+              postgresql_ops={"name_lower": "text_pattern_ops"}),
+        Index("ix_users_surname_lower", func.lower(surname).label("surname_lower"),
+              postgresql_ops={"surname_lower": "text_pattern_ops"}),
+    )
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.exceptions import raise_invalid_credentials
+from app.core.jwt.security import create_access_token, get_current_user, invalidate_principal, verify_password_async, \
+    hash_password_async, needs_rehash
+from app.core.rate_limit import enforce_rate_limit
+from app.models.user import User
+from app.schemas.change_password_schema import ChangePasswordRequest
+from app.schemas.login_request import LoginRequest
+
+router = APIRouter()
+
+
+@router.post("/login")
+async def login(login_request: LoginRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)):
+    enforce_rate_limit(http_request, "user", login_request.username)
+    user = (await db.execute(select(User).where(User.username == login_request.username))).scalars().first()
+    if not user or not await verify_password_async(login_request.password, user.password):
+        raise_invalid_credentials()
+
+    if needs_rehash(user.password):
+        user.password = await hash_password_async(login_request.password)
+        await db.commit()
+
+    access_token = create_access_token(data={"sub": user.username}, role=user.role)
+    return {"access_token": access_token}
+
+
+@router.post("/change-password")
+async def change_password(request: ChangePasswordRequest, http_request: Request,
+                          db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    enforce_rate_limit(http_request, "user", curr_user.username)
+    user = await db.get(User, curr_user.id)
+
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not await verify_password_async(request.current_password, user.password):
+        raise HTTPException(status_code=400, detail="Incorrect current password")
+
+    if request.new_password != request.confirm_password:
+        raise HTTPException(status_code=400, detail="Passwords do not match")
+
+    if request.new_password == request.current_password:
+        raise HTTPException(status_code=400, detail="Current password is same")
+
+    user.password = await hash_password_async(request.new_password)
+    await db.commit()
+    invalidate_principal(curr_user.username)
+
+    return {"message": "Password changed successfully!"}
@@ -0,0 +1,240 @@
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, RESPONSE_CACHE_MAX_AGE
+from app.core.database import get_db, get_async_db, get_read_db
+from app.core.exceptions import raise_user_not_found, raise_course_not_found, raise_user_not_permitted, \
+    raise_invalid_export_columns, raise_course_archived
+from app.core.jwt.security import get_current_user
+from app.core.pagination import decode_cursor, prefix_filter, count_rows, fetch_page
+from app.core.response_cache import response_cache, invalidate_on_commit
+from app.core.serialization import json_response, rows_to_dicts, serialize_rows
+from app.core.uploads import CSV_CONTENT_TYPES, media_type
+from app.models import Course, StudentCourseTotals, ArchivedCourseAssignments
+from app.models.course_assignments import CourseAssignments
+from app.models.professor_courses import ProfessorCourses
+from app.models.user import User
+from app.schemas.course_schema import COURSE_RESPONSE_FIELDS, course_list_adapter
+from app.schemas.enrollment_schema import BatchEnrollmentRequest
+from app.schemas.user_schema import USER_RESPONSE_FIELDS, user_list_adapter
+from app.services.archive import course_tables
+from app.services.enrollment import read_enrollment_csv, enroll_students
+from app.services.export import parse_export_columns, iter_grade_export
+from app.services.gradebook import course_gradebook
+
+router = APIRouter()
+
+invalidate_on_commit((Course, ProfessorCourses), lambda instance: ("courses",))
+
+
+@router.get("/courses")
+async def get_all_courses(request: Request, semester: int | None = None, q: str | None = None,
+                          after: str | None = None, limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                          include_total: bool = False, db: AsyncSession = Depends(get_read_db)):
+    after_id = decode_cursor(after)
+    query = select(Course.id, Course.name, Course.code, Course.semester)
+    if semester is not None:
+        query = query.where(Course.semester == semester)
+    if q:
+        query = query.where(prefix_filter((Course.name, Course.code), q))
+
+    async def build(response: Response):
+        try:
+            if include_total:
+                response.headers["X-Total-Count"] = str(await count_rows(db, query))
+            courses = await fetch_page(db, query, Course.id, after_id, limit, response)
+            return serialize_rows(courses, course_list_adapter, COURSE_RESPONSE_FIELDS)
+            # return [
+            #     {"id": course.id, "name": course.name, "code": course.code, "semester": course.semester}
+            #     for course in courses]
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await response_cache.respond(request, ("courses",), build, db=db,
+                                        cache_control=f"public, max-age={RESPONSE_CACHE_MAX_AGE}")
+
+
+@router.get("/courses/{course_id}/students")
+async def get_course_students(course_id: int, db: AsyncSession = Depends(get_async_db),
+                              curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    course = await db.get(Course, course_id)
+
+    if not course:
+        raise_course_not_found()
+
+    _, assignments, _ = course_tables(course.archived_at is not None)
+    students = (await db.execute(
+        select(User.id, User.username, User.name, User.surname)
+        .join(assignments, assignments.student_id == User.id)
+        .where(assignments.course_id == course_id)
+        .order_by(assignments.id)
+    )).all()
+
+    if not students:
+        return {"message": "No students enrolled in this course"}
+
+    return json_response({"students": serialize_rows(students, user_list_adapter, USER_RESPONSE_FIELDS)})
+
+
+@router.get("/courses/{course_id}/gradebook")
+async def get_course_gradebook(course_id: int, db: AsyncSession = Depends(get_async_db),
+                               curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    gradebook = await course_gradebook(db, course_id)
+    if gradebook is None:
+        course = await db.get(Course, course_id)
+        if not course:
+            raise_course_not_found()
+        if course.archived_at is not None:
+            gradebook = await course_gradebook(db, course_id, archived=True)
+    if gradebook is None:
+        return {"message": "No students enrolled in this course"}
+
+    return json_response(gradebook)
+
+
+@router.get("/courses/{course_id}/grades/export")
+async def export_course_grades(course_id: int, columns: str | None = None,
+                               date_from: datetime.datetime | None = Query(None, alias="from"),
+                               date_to: datetime.datetime | None = Query(None, alias="to"),
+                               db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    selected, unknown = parse_export_columns(columns)
+    if unknown:
+        raise_invalid_export_columns(unknown)
+
+    course = await db.get(Course, course_id)
+    if not course:
+        raise_course_not_found()
+
+    return StreamingResponse(
+        iter_grade_export(course_id, selected, date_from, date_to, course.archived_at is not None),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{course.code}-grades.csv"'},
+    )
+
+
+@router.get("/courses/{course_id}/leaderboard")
+async def get_course_leaderboard(course_id: int, limit: int = Query(50, ge=1, le=PAGE_SIZE_MAX),
+                                 db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    course = await db.get(Course, course_id)
+    if not course:
+        raise_course_not_found()
+
+    rank = func.rank().over(order_by=StudentCourseTotals.earned_points.desc()).label("rank")
+    results = (await db.execute(
+        select(rank, StudentCourseTotals.student_id, User.username, User.name, User.surname,
+               StudentCourseTotals.earned_points, StudentCourseTotals.max_points, StudentCourseTotals.graded_count)
+        .join(User, User.id == StudentCourseTotals.student_id)
+        .where(StudentCourseTotals.course_id == course_id)
+        .order_by(StudentCourseTotals.earned_points.desc(), StudentCourseTotals.student_id)
+        .limit(limit)
+    )).mappings().all()
+
+    return {"course_id": course_id, "leaderboard": [dict(row) for row in results]}
+
+
+@router.post("/courses/{course_id}/enroll")
+async def enroll_course(course_id: int, user_id: int, db: AsyncSession = Depends(get_async_db),
+                        curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    course = await db.get(Course, course_id)
+    if not course:
+        raise_course_not_found()
+    if course.archived_at is not None:
+        raise_course_archived()
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise_user_not_found()
+
+    existing_enrollment = (await db.execute(
+        select(CourseAssignments.id).where(
+            CourseAssignments.course_id == course_id,
+            CourseAssignments.student_id == user_id)
+    )).first()
+
+    if existing_enrollment:
+        raise HTTPException(status_code=400, detail="User already enrolled in this course")
+
+    enrollment = CourseAssignments(student_id=user_id, course_id=course_id)
+    db.add(enrollment)
+    await db.commit()
+    await response_cache.bump_async(f"enrollments:{user_id}")
+    return {"message": "User enrolled successfully"}
+
+
+@router.post("/courses/{course_id}/enroll/batch")
+async def enroll_course_batch(course_id: int, request: Request, db: AsyncSession = Depends(get_async_db),
+                              curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    course = await db.get(Course, course_id)
+    if not course:
+        raise_course_not_found()
+    if course.archived_at is not None:
+        raise_course_archived()
+
+    if media_type(request.headers.get("content-type")) in CSV_CONTENT_TYPES:
+        groups = await read_enrollment_csv(request.stream())
+    else:
+        try:
+            groups = BatchEnrollmentRequest.model_validate_json(await request.body()).groups
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+
+    report = await enroll_students(db, course_id, groups)
+    await db.commit()
+    await response_cache.bump_async(*(f"enrollments:{user_id}" for user_id in report["enrolled"]))
+    return report
+
+
+@router.get("/course/{user_id}")
+def get_user_courses(user_id: int, db: Session = Depends(get_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"] and curr_user.id != user_id:
+        raise_user_not_permitted()
+
+
+@router.get("/my-courses")
+async def get_user_courses(request: Request, db: AsyncSession = Depends(get_read_db),
+                           curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        query = union_all(*(
+            select(Course.id, Course.name, Course.code, Course.semester)
+            .join(assignments, Course.id == assignments.course_id)
+            .where(assignments.student_id == curr_user.id)
+            for assignments in (CourseAssignments, ArchivedCourseAssignments)
+        ))
+    else:
+        query = (
+            select(Course.id, Course.name, Course.code, Course.semester)
+            .join(ProfessorCourses, Course.id == ProfessorCourses.course_id)
+            .where(ProfessorCourses.professor_id == curr_user.id)
+        )
+
+    async def build(response: Response):
+        courses = rows_to_dicts((await db.execute(query)).all(), ("id", "name", "code", "semester"))
+        return {"courses": [{"course": course} for course in courses]}
+
+    return await response_cache.respond(request, ("courses", f"enrollments:{curr_user.id}"), build,
+                                        principal=curr_user.id, db=db)
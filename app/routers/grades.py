@@ -0,0 +1,187 @@
+import base64
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import GRADE_SYNC_MAX_SCANS
+from app.core.database import get_async_db
+from app.core.etag import etag_matches
+from app.core.events import publish_grades
+from app.core.exceptions import raise_user_not_permitted, raise_lab_exercise_not_found, raise_job_not_found, \
+    raise_job_not_ready, raise_server_busy, raise_too_many_scans
+from app.core.jwt.security import get_current_user
+from app.core.qr import SCAN_PAGE, grading_url, cached_qr_png, get_qr_png
+from app.models import CourseAssignments, LaboratoryExercise
+from app.models.user import User
+from app.schemas.grade_schema import GradeRequest, GradeSyncRequest
+from app.services.grades import iter_grade_rows, import_lab_grades, read_grade, record_grade, sync_grades
+from app.services.idempotency import request_fingerprint, run_idempotent
+from app.services.qr_sheets import SHEET_MEDIA_TYPES, start_qr_sheet_job, get_qr_sheet_job
+
+router = APIRouter()
+
+
+@router.get("/generate_qr/{lab_exercise_id}/{student_id}")
+async def generate_qr(lab_exercise_id: int, student_id: int, response_format: str = Query("json", alias="format"),
+                      if_none_match: str | None = Header(None), db: AsyncSession = Depends(get_async_db)):
+    lab_exercise_exists, student_exists = (await db.execute(select(
+        select(LaboratoryExercise.id).where(LaboratoryExercise.id == lab_exercise_id).scalar_subquery(),
+        select(User.id).where(User.id == student_id).scalar_subquery(),
+    ))).one()
+    if not lab_exercise_exists:
+        raise HTTPException(status_code=404, detail="Lab exercise not found")
+    if not student_exists:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    qr_url = grading_url(lab_exercise_id, student_id)
+    cached = cached_qr_png(qr_url)
+    if cached is None:
+        cached = await run_in_threadpool(get_qr_png, qr_url)
+
+    png, digest = cached
+    is_png = response_format == "png"
+    headers = {
+        "ETag": f'"{digest}"' if is_png else f'"{digest}-json"',
+        "Cache-Control": "private, max-age=86400",
+    }
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if is_png:
+        return Response(content=png, media_type="image/png", headers=headers)
+
+    qr_base64 = base64.b64encode(png).decode("utf-8")
+    return JSONResponse({"qr_code": f"data:image/png;base64,{qr_base64}"}, headers=headers)
+
+
+@router.post("/lab-exercises/{lab_exercise_id}/qr-sheets", status_code=202)
+async def create_qr_sheet(lab_exercise_id: int, response: Response,
+                          sheet_format: Literal["pdf", "zip"] = Query("pdf", alias="format"),
+                          db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    course_id = await db.scalar(select(LaboratoryExercise.course_id).where(LaboratoryExercise.id == lab_exercise_id))
+    if course_id is None:
+        raise_lab_exercise_not_found()
+
+    students = (await db.execute(
+        select(User.id, User.name, User.surname, User.username)
+        .join(CourseAssignments, CourseAssignments.student_id == User.id)
+        .where(CourseAssignments.course_id == course_id)
+        .order_by(User.surname, User.name, User.username)
+    )).all()
+
+    job = await start_qr_sheet_job(
+        lab_exercise_id, sheet_format, curr_user.id,
+        [(student_id, (f"{name or ''} {surname or ''}".strip(), username))
+         for student_id, name, surname, username in students],
+    )
+    if job is None:
+        raise_server_busy(5)
+
+    response.headers["Location"] = f"/qr-sheets/{job.id}"
+    return job.to_dict()
+
+
+@router.get("/qr-sheets/{job_id}")
+async def get_qr_sheet(job_id: str, curr_user=Depends(get_current_user)):
+    job = await get_qr_sheet_job(job_id, curr_user.id)
+    if job is None:
+        raise_job_not_found()
+
+    return job.to_dict()
+
+
+@router.get("/qr-sheets/{job_id}/download")
+async def download_qr_sheet(job_id: str, curr_user=Depends(get_current_user)):
+    job = await get_qr_sheet_job(job_id, curr_user.id)
+    if job is None:
+        raise_job_not_found()
+    if job.status != "done":
+        raise_job_not_ready(job.status)
+
+    return FileResponse(job.path, media_type=SHEET_MEDIA_TYPES[job.format],
+                        filename=f"lab-{job.lab_exercise_id}-qr-codes.{job.format}")
+
+
+async def _publish_changes(changes: dict):
+    for (course_id, lab_exercise_id), points_by_student in changes.items():
+        await publish_grades(course_id, lab_exercise_id, points_by_student)
+
+
+@router.get("/scan/{lab_exercise_id}/{student_id}", response_class=HTMLResponse)
+async def scan_page(lab_exercise_id: int, student_id: int):
+    return HTMLResponse(SCAN_PAGE, headers={"Cache-Control": "public, max-age=86400"})
+
+
+@router.get("/grade/{lab_exercise_id}/{student_id}")
+async def get_grade_data(lab_exercise_id: int, student_id: int, db: AsyncSession = Depends(get_async_db),
+                         curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    return await read_grade(db, lab_exercise_id, student_id)
+
+
+@router.post("/grade/sync")
+async def sync_student_grades(sync_request: GradeSyncRequest, request: Request,
+                              idempotency_key: str | None = Header(None), db: AsyncSession = Depends(get_async_db),
+                              curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+    if len(sync_request.scans) > GRADE_SYNC_MAX_SCANS:
+        raise_too_many_scans(GRADE_SYNC_MAX_SCANS)
+
+    changes = {}
+    fingerprint = request_fingerprint(request.method, request.url.path, sync_request.model_dump())
+    report, replayed = await run_idempotent(db, curr_user.id, idempotency_key, fingerprint,
+                                            lambda: sync_grades(db, sync_request.scans, changes))
+    if replayed:
+        return JSONResponse(report, headers={"Idempotent-Replayed": "true"})
+
+    await _publish_changes(changes)
+    return report
+
+
+@router.post("/grade/{lab_exercise_id}/{student_id}")
+async def grade_student(lab_exercise_id: int, student_id: int, grade_request: GradeRequest, request: Request,
+                        idempotency_key: str | None = Header(None), db: AsyncSession = Depends(get_async_db),
+                        curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    changes = {}
+    fingerprint = request_fingerprint(request.method, request.url.path, grade_request.model_dump())
+    grade, replayed = await run_idempotent(
+        db, curr_user.id, idempotency_key, fingerprint,
+        lambda: record_grade(db, lab_exercise_id, student_id, grade_request.points, changes),
+    )
+    if replayed:
+        return JSONResponse(grade, headers={"Idempotent-Replayed": "true"})
+
+    await _publish_changes(changes)
+    return grade
+
+
+@router.post("/lab-exercises/{lab_exercise_id}/grades/import")
+async def import_grades(lab_exercise_id: int, request: Request, db: AsyncSession = Depends(get_async_db),
+                        curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    lab_exercise = await db.get(LaboratoryExercise, lab_exercise_id)
+    if not lab_exercise:
+        raise_lab_exercise_not_found()
+
+    rows = iter_grade_rows(request.stream(), request.headers.get("content-type"))
+    changes = {}
+    report = await import_lab_grades(db, lab_exercise, rows, changes)
+    await db.commit()
+    await publish_grades(lab_exercise.course_id, lab_exercise_id, changes)
+    return report
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.database import read_routing
+from app.core.events import event_bus
+from app.core.exceptions import raise_user_not_permitted
+from app.core.jwt import hashing
+from app.core.jwt.security import get_current_user, principal_cache
+from app.core.metrics import registry
+from app.core.photos import photo_cache
+from app.core.qr import qr_cache
+from app.core.rate_limit import admission_stats, rejections
+from app.core.response_cache import response_cache
+
+router = APIRouter()
+
+
+@router.get("/stats/cache")
+def get_cache_stats(curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR"]:
+        raise_user_not_permitted()
+
+    return {"principal": principal_cache.stats(), "qr": qr_cache.stats(), "response": response_cache.stats(),
+            "photo": photo_cache.stats()}
+
+
+@router.get("/stats/hashing")
+def get_hashing_stats(curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR"]:
+        raise_user_not_permitted()
+
+    return hashing.metrics.snapshot()
+
+
+@router.get("/stats/admission")
+def get_admission_stats(curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR"]:
+        raise_user_not_permitted()
+
+    return admission_stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    caches = {"principal": principal_cache.stats(), "qr": qr_cache.stats(), "response": response_cache.stats(),
+              "photo": photo_cache.stats()}
+    counters = {
+        f"labtrack_cache_{kind}_total": (f"Cache {kind} by cache.",
+                                         {f'{{cache="{name}"}}': stats[kind] for name, stats in caches.items()})
+        for kind in ("hits", "misses")
+    }
+    events = event_bus.stats()
+    counters.update({
+        f"labtrack_events_{kind}_total": (f"Grade events {kind}.", {"": events[kind]})
+        for kind in ("published", "delivered", "dropped")
+    })
+    counters["labtrack_db_reads_total"] = (
+        "Read-only sessions by target: replica, primary (read-your-writes) or fallback (replica unavailable).",
+        {f'{{target="{target}"}}': count for target, count in read_routing.items()}
+    )
+    counters["labtrack_admission_rejections_total"] = (
+        "Requests rejected by rate limiting or admission control.",
+        {f'{{route="{route}",reason="{reason}"}}': count for (route, reason), count in rejections.snapshot().items()}
+    )
+    return PlainTextResponse(registry.render(counters), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,189 @@
+from fastapi import APIRouter, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.database import get_db, get_async_db, get_read_db
+from app.core.events import event_bus, grade_topic
+from app.core.exceptions import raise_user_not_permitted
+from app.core.jwt.security import get_current_user, get_stream_user, create_feed_token, verify_feed_token
+from app.core.response_cache import response_cache
+from app.models import Course, TimeDetails
+from app.models.course_assignments import CourseAssignments
+from app.services.archive import HOT_TABLES, ARCHIVE_TABLES
+from app.services.timetable import student_timetable, render_ics, timetable_namespaces
+
+router = APIRouter()
+
+
+@router.get("/my-timetable")
+async def get_my_timetable(request: Request, db: AsyncSession = Depends(get_read_db),
+                           curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["STUDENT"]:
+        raise_user_not_permitted()
+
+    async def build(response: Response):
+        return {"sessions": await student_timetable(db, curr_user.id)}
+
+    return await response_cache.respond(request, timetable_namespaces(curr_user.id), build, principal=curr_user.id,
+                                        db=db)
+
+
+@router.get("/my-timetable/feed")
+async def get_my_timetable_feed(request: Request, curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["STUDENT"]:
+        raise_user_not_permitted()
+
+    token, expires_at = create_feed_token(curr_user.id)
+    return {"url": str(request.url_for("get_timetable_feed").include_query_params(token=token)),
+            "expires_at": expires_at}
+
+
+@router.get("/timetable.ics")
+async def get_timetable_feed(request: Request, token: str, db: AsyncSession = Depends(get_read_db)):
+    student_id = verify_feed_token(token)
+
+    async def build(response: Response):
+        return await student_timetable(db, student_id)
+
+    return await response_cache.respond(request, timetable_namespaces(student_id), build, principal=student_id, db=db,
+                                        media_type="text/calendar",
+                                        render=lambda sessions: render_ics(student_id, sessions))
+
+
+@router.get("/student/{course_id}")
+async def get_course_current_user_exercises(course_id: int, db: AsyncSession = Depends(get_read_db),
+                                            curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["STUDENT"]:
+        raise_user_not_permitted()
+
+    def exercises_query(exercises, assignments, points):
+        return (
+            select(
+                assignments.id.label("assignment_id"),
+                exercises.id.label("exercise_id"),
+                exercises.name.label("exercise_name"),
+                exercises.date_time.label("exercise_date"),
+                exercises.max_points.label("exercise_max_points"),
+                TimeDetails.id.label("time_details_id"),
+                TimeDetails.group_name.label("time_details_group_name"),
+                TimeDetails.room.label("time_details_room"),
+                TimeDetails.time.label("time_details_time"),
+                points.points.label("student_points")
+            )
+            .join(exercises, exercises.course_id == assignments.course_id)
+            .join(TimeDetails, TimeDetails.id == assignments.time_details_id)
+            .outerjoin(points,
+                       (points.lab_exercise_id == exercises.id) &
+                       (points.student_id == curr_user.id))
+            .where(assignments.student_id == curr_user.id)
+            .where(assignments.course_id == course_id)
+        )
+
+    results = (await db.execute(exercises_query(*HOT_TABLES))).all()
+    if not results and await db.scalar(select(Course.archived_at).where(Course.id == course_id)):
+        results = (await db.execute(exercises_query(*ARCHIVE_TABLES))).all()
+
+    response = {"assignments": []}
+
+    for assignment_id, exercise_id, exercise_name, exercise_date, exercise_max_points, \
+            time_details_id, time_details_group_name, time_details_room, time_details_time, student_points in results:
+        response["assignments"].append({
+            "assignment_id": assignment_id,
+            "exercise_id": exercise_id,
+            "exercise_name": exercise_name,
+            "exercise_date": exercise_date,
+            "exercise_max_points": exercise_max_points,
+            "student_points": student_points if student_points is not None else "Not Graded",
+            "time_details": {
+                "time_details_id": time_details_id,
+                "group_name": time_details_group_name,
+                "room": time_details_room,
+                "time": time_details_time,
+            }
+        })
+
+    return response
+
+
+@router.get("/student/{course_id}/events")
+async def stream_course_grade_events(course_id: int, last_event_id: str | None = Header(None),
+                                     db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_stream_user)):
+    if curr_user.role not in ["STUDENT"]:
+        raise_user_not_permitted()
+
+    enrolled = await db.scalar(
+        select(CourseAssignments.id)
+        .where(CourseAssignments.student_id == curr_user.id, CourseAssignments.course_id == course_id)
+        .limit(1)
+    )
+    if enrolled is None:
+        raise_user_not_permitted()
+
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return StreamingResponse(
+        event_bus.stream(grade_topic(course_id, curr_user.id), resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/student/{course_id}")
+def get_course_exercises(course_id: int, db: Session = Depends(get_db), curr_user=Depends(get_current_user)):
+    courses = (
+        db.query(Course)
+        .join(CourseAssignments, CourseAssignments.course_id == Course.id)
+        .join(TimeDetails, TimeDetails.id == CourseAssignments.time_details_id)
+        .filter(CourseAssignments.student_id == curr_user.id)
+        .filter(Course.id == course_id)
+        .options(joinedload(Course.assignments))
+        .all()
+    )
+    return courses
+
+
+@router.get("/student/{student_id}/courses-exercises")
+async def get_student_courses_exercises(student_id: int, db: AsyncSession = Depends(get_read_db),
+                                        curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"] and curr_user.id != student_id:
+        raise_user_not_permitted()
+
+    query = union_all(*(
+        select(
+            Course.id.label("course_id"),
+            Course.name.label("course_name"),
+            exercises.id.label("exercise_id"),
+            exercises.name.label("exercise_name"),
+            exercises.date_time.label("exercise_date"),
+            exercises.max_points.label("exercise_max_points"),
+            points.points.label("points"),
+
+        )
+        .join(exercises, exercises.course_id == Course.id)
+        .join(points, points.lab_exercise_id == exercises.id,
+              isouter=True)
+        .where(points.student_id == student_id)
+        for exercises, _, points in (HOT_TABLES, ARCHIVE_TABLES)
+    ))
+
+    results = (await db.execute(query)).all()
+
+    response = {}
+    for course_id, course_name, exercise_id, exercise_name, exercise_date, exercise_max_points, points in results:
+        if course_id not in response:
+            response[course_id] = {
+                "course_id": course_id,
+                "course_name": course_name,
+                "exercises": []
+            }
+
+        response[course_id]["exercises"].append({
+            "exercise_id": exercise_id,
+            "exercise_name": exercise_name,
+            "points": points if points is not None else "Not Graded",
+            "max_points": exercise_max_points,
+            "date": exercise_date
+        })
+
+    return list(response.values())
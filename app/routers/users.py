@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, PHOTO_THUMBNAIL_SIZES
+from app.core.database import get_async_db
+from app.core.etag import etag_matches
+from app.core.exceptions import raise_user_not_found, raise_user_not_permitted
+from app.core.jwt.security import get_current_user
+from app.core.pagination import decode_cursor, prefix_filter, count_rows, fetch_page
+from app.core.photos import photo_cache, photo_digest, render_photo
+from app.core.serialization import json_response, rows_to_dicts
+from app.models.user import User
+from app.schemas.user_schema import UserResponse
+
+router = APIRouter()
+
+
+@router.get("/students")
+async def get_all_students(response: Response, role: str | None = None, q: str | None = None,
+                           after: str | None = None, limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                           include_total: bool = False, db: AsyncSession = Depends(get_async_db),
+                           curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    after_id = decode_cursor(after)
+    query = (
+        select(User.id, User.username, User.name, User.surname, User.role)
+        .where(User.role != "PROFESSOR", User.role != "ASSISTANT")
+    )
+    if role:
+        query = query.where(User.role == role)
+    if q:
+        query = query.where(prefix_filter((User.username, User.name, User.surname), q))
+
+    try:
+        if include_total:
+            response.headers["X-Total-Count"] = str(await count_rows(db, query))
+        users = await fetch_page(db, query, User.id, after_id, limit, response)
+        return json_response(rows_to_dicts(users, ("id", "username", "name", "surname", "role")),
+                             headers_from=response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/users/{user_id}")
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"]:
+        raise_user_not_permitted()
+
+    user = await db.get(User, user_id)
+
+    if not user:
+        raise_user_not_found()
+
+    return UserResponse.model_validate(user)
+    # return {"username": user.username, "name": user.name, "surname": user.surname}
+
+
+@router.get("/users/{user_id}/photo")
+async def get_user_photo(user_id: int, size: int | None = None, if_none_match: str | None = Header(None),
+                         db: AsyncSession = Depends(get_async_db), curr_user=Depends(get_current_user)):
+    if curr_user.role not in ["PROFESSOR", "ASSISTANT"] and curr_user.id != user_id:
+        raise_user_not_permitted()
+    if size is not None and size not in PHOTO_THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"size must be one of {list(PHOTO_THUMBNAIL_SIZES)}")
+
+    cached = photo_cache.get((user_id, size))
+    if cached is None:
+        photo = await db.scalar(select(User.photo).where(User.id == user_id))
+        if not photo:
+            raise HTTPException(status_code=404, detail="Photo not found")
+
+        rendered = await run_in_threadpool(render_photo, photo, size)
+        if rendered is None:
+            raise HTTPException(status_code=404, detail="Photo is not a valid image")
+
+        content, media_type = rendered
+        digest = photo_digest(photo)
+        cached = (content, media_type, f'"{digest}-{size}"' if size else f'"{digest}"')
+        photo_cache.set((user_id, size), cached)
+
+    content, media_type, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=content, media_type=media_type, headers=headers)
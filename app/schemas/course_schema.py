@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class CourseResponse(BaseModel):
@@ -7,4 +7,8 @@ class CourseResponse(BaseModel):
     semester: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+COURSE_RESPONSE_FIELDS = ("name", "code", "semester")
+course_list_adapter = TypeAdapter(list[CourseResponse])
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class EnrollmentGroup(BaseModel):
+    time_details_id: int
+    user_ids: list[int] = []
+    usernames: list[str] = []
+
+
+class BatchEnrollmentRequest(BaseModel):
+    groups: list[EnrollmentGroup]
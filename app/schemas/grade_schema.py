@@ -0,0 +1,18 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class GradeRequest(BaseModel):
+    points: int | None = None
+
+
+class GradeScan(BaseModel):
+    lab_exercise_id: int
+    student_id: int
+    points: int | None = None
+    scanned_at: datetime.datetime
+
+
+class GradeSyncRequest(BaseModel):
+    scans: list[GradeScan]
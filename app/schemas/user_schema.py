@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class UserResponse(BaseModel):
@@ -9,3 +9,7 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+USER_RESPONSE_FIELDS = ("id", "username", "name", "surname")
+user_list_adapter = TypeAdapter(list[UserResponse])
@@ -0,0 +1,74 @@
+import datetime
+
+from sqlalchemy import delete, select, update
+
+from app.models import ArchivedCourseAssignments, ArchivedLaboratoryExercise, ArchivedStudentPoints, Course, \
+    CourseAssignments, LaboratoryExercise, StudentPoints
+
+HOT_TABLES = (LaboratoryExercise, CourseAssignments, StudentPoints)
+ARCHIVE_TABLES = (ArchivedLaboratoryExercise, ArchivedCourseAssignments, ArchivedStudentPoints)
+
+
+def course_tables(archived: bool) -> tuple:
+    return ARCHIVE_TABLES if archived else HOT_TABLES
+
+
+def _copy(session, source, target, where):
+    columns = [column.name for column in source.__table__.columns]
+    session.execute(target.__table__.insert().from_select(columns, select(*source.__table__.columns).where(where)))
+
+
+def _move_batches(session, source, target, where, batch_size: int) -> int:
+    moved = 0
+    while True:
+        with session.begin():
+            batch = select(source.id).where(where).order_by(source.id).limit(batch_size).scalar_subquery()
+            _copy(session, source, target, source.id.in_(batch))
+            count = session.execute(delete(source.__table__).where(source.id.in_(batch))).rowcount
+        moved += count
+        if count < batch_size:
+            return moved
+
+
+def _move_course(session, course_id: int, source_tables, target_tables, archived_at, batch_size: int) -> dict:
+    source_exercise, source_assignments, source_points = source_tables
+    target_exercise, target_assignments, target_points = target_tables
+
+    with session.begin():
+        _copy(session, source_exercise, target_exercise,
+              (source_exercise.course_id == course_id) & source_exercise.id.not_in(select(target_exercise.id)))
+
+    points = _move_batches(
+        session, source_points, target_points,
+        source_points.lab_exercise_id.in_(select(source_exercise.id).where(source_exercise.course_id == course_id)),
+        batch_size,
+    )
+    assignments = _move_batches(session, source_assignments, target_assignments,
+                                source_assignments.course_id == course_id, batch_size)
+
+    with session.begin():
+        exercises = session.execute(
+            delete(source_exercise.__table__).where(source_exercise.course_id == course_id)
+        ).rowcount
+        session.execute(update(Course.__table__).where(Course.id == course_id).values(archived_at=archived_at))
+
+    return {"course_id": course_id, "exercises": exercises, "assignments": assignments, "points": points}
+
+
+def archive_semester(session, semester: int, batch_size: int) -> list[dict]:
+    course_ids = session.execute(
+        select(Course.id).where(Course.semester == semester, Course.archived_at.is_(None)).order_by(Course.id)
+    ).scalars().all()
+    session.rollback()
+    archived_at = datetime.datetime.utcnow()
+    return [_move_course(session, course_id, HOT_TABLES, ARCHIVE_TABLES, archived_at, batch_size)
+            for course_id in course_ids]
+
+
+def restore_semester(session, semester: int, batch_size: int) -> list[dict]:
+    course_ids = session.execute(
+        select(Course.id).where(Course.semester == semester, Course.archived_at.is_not(None)).order_by(Course.id)
+    ).scalars().all()
+    session.rollback()
+    return [_move_course(session, course_id, ARCHIVE_TABLES, HOT_TABLES, None, batch_size)
+            for course_id in course_ids]
@@ -0,0 +1,105 @@
+import csv
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+
+from app.core.database import dialect_insert
+from app.core.uploads import iter_lines
+from app.models import CourseAssignments, TimeDetails, User
+from app.schemas.enrollment_schema import EnrollmentGroup
+
+
+async def read_enrollment_csv(stream) -> list[EnrollmentGroup]:
+    groups = {}
+    header = None
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            if "time_details_id" not in header or ("user_id" not in header and "username" not in header):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail="CSV header must contain time_details_id and user_id or username")
+            continue
+
+        row = dict(zip(header, (value.strip() for value in values)))
+        try:
+            time_details_id = int(row["time_details_id"])
+        except (KeyError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Invalid time_details_id in row: {line}")
+
+        group = groups.setdefault(time_details_id, EnrollmentGroup(time_details_id=time_details_id))
+        if row.get("user_id", "").isdigit():
+            group.user_ids.append(int(row["user_id"]))
+        elif row.get("username"):
+            group.usernames.append(row["username"])
+
+    return list(groups.values())
+
+
+async def enroll_students(db, course_id: int, groups: list[EnrollmentGroup]) -> dict:
+    time_details_ids = {group.time_details_id for group in groups}
+    known_time_details = set((await db.execute(
+        select(TimeDetails.id).where(TimeDetails.id.in_(time_details_ids))
+    )).scalars())
+    if time_details_ids - known_time_details:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown time_details_id: {sorted(time_details_ids - known_time_details)}")
+
+    user_ids = {user_id for group in groups for user_id in group.user_ids}
+    usernames = {username for group in groups for username in group.usernames}
+    users = (await db.execute(
+        select(User.id, User.username).where(or_(User.id.in_(user_ids), User.username.in_(usernames)))
+    )).all()
+    ids_by_username = {username: user_id for user_id, username in users}
+    known_ids = {user_id for user_id, _ in users}
+
+    requested = {}
+    unknown = []
+    for group in groups:
+        for identifier in [*group.user_ids, *group.usernames]:
+            user_id = identifier if isinstance(identifier, int) else ids_by_username.get(identifier)
+            if user_id is None or user_id not in known_ids:
+                unknown.append(identifier)
+                continue
+            requested.setdefault(user_id, group.time_details_id)
+
+    already_enrolled = set((await db.execute(
+        select(CourseAssignments.student_id)
+        .where(CourseAssignments.course_id == course_id, CourseAssignments.student_id.in_(requested))
+    )).scalars()) if requested else set()
+
+    rows = [
+        {"student_id": user_id, "course_id": course_id, "time_details_id": time_details_id}
+        for user_id, time_details_id in requested.items() if user_id not in already_enrolled
+    ]
+    inserted = await _insert_missing(db, course_id, rows) if rows else set()
+    enrolled = [row["student_id"] for row in rows if row["student_id"] in inserted]
+
+    return {
+        "enrolled": enrolled,
+        "skipped": sorted(set(requested) - set(enrolled)),
+        "unknown": unknown,
+    }
+
+
+async def _insert_missing(db, course_id: int, rows: list[dict]) -> set[int]:
+    statement = dialect_insert(db, CourseAssignments.__table__).values(rows).on_conflict_do_nothing(
+        index_elements=["course_id", "student_id"]
+    )
+    if db.bind.dialect.name == "postgresql":
+        return set((await db.execute(statement.returning(CourseAssignments.student_id))).scalars())
+
+    inserted = (await db.execute(statement)).rowcount
+    if inserted == len(rows):
+        return {row["student_id"] for row in rows}
+    # SQLite has one writer at a time, so rows committed by a concurrent batch got lower ids than ours.
+    return set((await db.execute(
+        select(CourseAssignments.student_id)
+        .where(CourseAssignments.course_id == course_id,
+               CourseAssignments.student_id.in_([row["student_id"] for row in rows]))
+        .order_by(CourseAssignments.id.desc())
+        .limit(inserted)
+    )).scalars()) if inserted else set()
@@ -0,0 +1,88 @@
+import csv
+import datetime
+import io
+
+from sqlalchemy import select
+
+from app.core.config import EXPORT_BATCH_SIZE
+from app.core.database import SessionLocal
+from app.models import TimeDetails, User
+from app.services.archive import course_tables
+
+EXPORT_COLUMNS = {
+    "student_id": ("assignments", "student_id"),
+    "username": ("user", "username"),
+    "name": ("user", "name"),
+    "surname": ("user", "surname"),
+    "group_name": ("time_details", "group_name"),
+    "exercise_id": ("exercises", "id"),
+    "exercise_name": ("exercises", "name"),
+    "exercise_date": ("exercises", "date_time"),
+    "max_points": ("exercises", "max_points"),
+    "points": ("points", "points"),
+}
+DEFAULT_EXPORT_COLUMNS = ("student_id", "username", "name", "surname", "exercise_id", "exercise_name", "exercise_date",
+                          "max_points", "points")
+
+
+def parse_export_columns(columns: str | None) -> tuple[list[str], list[str]]:
+    if not columns:
+        return list(DEFAULT_EXPORT_COLUMNS), []
+    selected = [column.strip() for column in columns.split(",") if column.strip()]
+    return selected, [column for column in selected if column not in EXPORT_COLUMNS]
+
+
+def grade_export_query(course_id: int, columns: list[str], date_from: datetime.datetime | None = None,
+                       date_to: datetime.datetime | None = None, archived: bool = False):
+    exercises, assignments, points = course_tables(archived)
+    tables = {"exercises": exercises, "assignments": assignments, "points": points, "user": User,
+              "time_details": TimeDetails}
+    selected = []
+    for column in columns:
+        table, attribute = EXPORT_COLUMNS[column]
+        selected.append(getattr(tables[table], attribute).label(column))
+
+    query = (
+        select(*selected)
+        .select_from(assignments)
+        .join(exercises, exercises.course_id == assignments.course_id)
+        .outerjoin(points, (points.lab_exercise_id == exercises.id) & (points.student_id == assignments.student_id))
+        .where(assignments.course_id == course_id)
+        .order_by(assignments.student_id, exercises.date_time, exercises.id)
+    )
+    if {"username", "name", "surname"} & set(columns):
+        query = query.join(User, User.id == assignments.student_id)
+    if "group_name" in columns:
+        query = query.outerjoin(TimeDetails, TimeDetails.id == assignments.time_details_id)
+    if date_from is not None:
+        query = query.where(exercises.date_time >= date_from)
+    if date_to is not None:
+        query = query.where(exercises.date_time <= date_to)
+    return query
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def iter_grade_export(course_id: int, columns: list[str], date_from: datetime.datetime | None = None,
+                      date_to: datetime.datetime | None = None, archived: bool = False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    with SessionLocal() as db:
+        result = db.execute(
+            grade_export_query(course_id, columns, date_from, date_to, archived)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
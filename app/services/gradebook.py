@@ -0,0 +1,78 @@
+import warnings
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, select
+
+from app.services.archive import course_tables
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PERCENTILES = (25, 75, 90)
+
+
+def _nullable(values: "np.ndarray", present: "np.ndarray", as_int: bool = False) -> list:
+    import numpy as np
+
+    values = np.nan_to_num(values)
+    values = (values.astype(np.int64) if as_int else values.round(2)).astype(object)
+    values[~present] = None
+    return values.tolist()
+
+
+async def course_gradebook(db, course_id: int, archived: bool = False) -> dict | None:
+    import numpy as np
+
+    exercises, assignments, points = course_tables(archived)
+    rows = (await db.execute(
+        select(assignments.student_id, exercises.id, exercises.max_points, points.points)
+        .select_from(assignments)
+        .outerjoin(exercises, exercises.course_id == assignments.course_id)
+        .outerjoin(points, and_(points.lab_exercise_id == exercises.id, points.student_id == assignments.student_id))
+        .where(assignments.course_id == course_id)
+    )).all()
+    if not rows:
+        return None
+
+    student_column, exercise_column, max_points_column, points_column = zip(*rows)
+    student_ids, student_index = np.unique(np.array(student_column, dtype=np.int64), return_inverse=True)
+
+    has_exercise = np.array([exercise_id is not None for exercise_id in exercise_column])
+    exercise_values = np.array(exercise_column, dtype=object)[has_exercise].astype(np.int64)
+    exercise_ids, first_seen, exercise_index = np.unique(exercise_values, return_index=True, return_inverse=True)
+    max_points = np.array(max_points_column, dtype=object)[has_exercise].astype(np.int64)[first_seen]
+
+    matrix = np.full((len(student_ids), len(exercise_ids)), np.nan)
+    matrix[student_index[has_exercise], exercise_index] = np.array(points_column, dtype=float)[has_exercise]
+    graded = ~np.isnan(matrix)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        means = np.nanmean(matrix, axis=0)
+        medians = np.nanmedian(matrix, axis=0)
+        percentiles = np.nanpercentile(matrix, PERCENTILES, axis=0) if len(exercise_ids) else \
+            np.empty((len(PERCENTILES), 0))
+
+    exercise_graded = graded.sum(axis=0)
+    has_grades = exercise_graded > 0
+
+    return {
+        "course_id": course_id,
+        "student_ids": student_ids.tolist(),
+        "exercise_ids": exercise_ids.tolist(),
+        "max_points": max_points.tolist(),
+        "shape": [len(student_ids), len(exercise_ids)],
+        "points": _nullable(matrix.ravel(), graded.ravel(), as_int=True),
+        "student_totals": {
+            "earned": np.nansum(matrix, axis=1).astype(np.int64).tolist(),
+            "max": (graded * max_points).sum(axis=1).tolist(),
+            "graded_count": graded.sum(axis=1).tolist(),
+        },
+        "exercise_stats": {
+            "graded_count": exercise_graded.tolist(),
+            "mean": _nullable(means, has_grades),
+            "median": _nullable(medians, has_grades),
+            **{f"p{percentile}": _nullable(values, has_grades)
+               for percentile, values in zip(PERCENTILES, percentiles)},
+        },
+    }
@@ -0,0 +1,322 @@
+import csv
+import datetime
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+
+from app.core.config import GRADE_IMPORT_CHUNK_SIZE
+from app.core.database import dialect_insert
+from app.core.exceptions import raise_lab_exercise_not_found, raise_student_not_enrolled, raise_invalid_points
+from app.core.uploads import CSV_CONTENT_TYPES, JSON_LINES_CONTENT_TYPES, iter_lines, media_type
+from app.models import CourseAssignments, LaboratoryExercise, StudentPoints
+from app.services.totals import refresh_totals
+
+GRADE_KEY = ["lab_exercise_id", "student_id"]
+
+
+async def iter_csv_rows(lines):
+    header = None
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            if "student_id" not in header or "points" not in header:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail="CSV header must contain student_id and points columns")
+            continue
+
+        row_number += 1
+        yield row_number, dict(zip(header, values))
+
+
+async def iter_json_lines_rows(lines):
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def iter_grade_rows(stream, content_type: str | None):
+    if media_type(content_type) in CSV_CONTENT_TYPES:
+        return iter_csv_rows(iter_lines(stream))
+    if media_type(content_type) in JSON_LINES_CONTENT_TYPES:
+        return iter_json_lines_rows(iter_lines(stream))
+
+    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail="Upload grades as text/csv or application/x-ndjson")
+
+
+def _validate_row(row, max_points: int):
+    if row is None:
+        return None, "Row is not a JSON object"
+
+    try:
+        student_id = int(str(row.get("student_id")).strip())
+        points = int(str(row.get("points")).strip())
+    except (TypeError, ValueError):
+        return None, "student_id and points must be integers"
+
+    if not 0 <= points <= max_points:
+        return None, f"points must be between 0 and {max_points}"
+
+    return (student_id, points), None
+
+
+async def _apply_chunk(db, lab_exercise: LaboratoryExercise, rows, report: dict, changes: dict | None):
+    grades = {}
+    row_numbers = {}
+    for row_number, row in rows:
+        grade, error = _validate_row(row, lab_exercise.max_points)
+        if error:
+            report["errors"].append({"row": row_number, "error": error})
+            continue
+        student_id, points = grade
+        grades[student_id] = points
+        row_numbers[student_id] = row_number
+
+    if not grades:
+        return
+
+    enrolled = set((await db.execute(
+        select(CourseAssignments.student_id)
+        .where(CourseAssignments.course_id == lab_exercise.course_id,
+               CourseAssignments.student_id.in_(grades))
+    )).scalars())
+    for student_id in [student_id for student_id in grades if student_id not in enrolled]:
+        report["errors"].append({"row": row_numbers[student_id], "error": "Student is not enrolled in this course"})
+        del grades[student_id]
+
+    if not grades:
+        return
+
+    existing = set((await db.execute(
+        select(StudentPoints.student_id)
+        .where(StudentPoints.lab_exercise_id == lab_exercise.id, StudentPoints.student_id.in_(grades))
+    )).scalars())
+
+    now = datetime.datetime.utcnow()
+    statement = dialect_insert(db, StudentPoints.__table__).values([
+        {"lab_exercise_id": lab_exercise.id, "student_id": student_id, "points": points, "updated_at": now}
+        for student_id, points in sorted(grades.items())
+    ])
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=GRADE_KEY,
+        set_={"points": statement.excluded.points, "updated_at": statement.excluded.updated_at},
+    ))
+
+    await refresh_totals(db, lab_exercise.course_id, grades)
+    if changes is not None:
+        changes.update(grades)
+
+    report["updated"] += len(existing)
+    report["inserted"] += len(grades) - len(existing)
+
+
+async def import_lab_grades(db, lab_exercise: LaboratoryExercise, rows, changes: dict | None = None) -> dict:
+    report = {"rows": 0, "inserted": 0, "updated": 0, "errors": []}
+    chunk = []
+    async for row_number, row in rows:
+        report["rows"] = row_number
+        chunk.append((row_number, row))
+        if len(chunk) >= GRADE_IMPORT_CHUNK_SIZE:
+            await _apply_chunk(db, lab_exercise, chunk, report, changes)
+            chunk = []
+
+    if chunk:
+        await _apply_chunk(db, lab_exercise, chunk, report, changes)
+
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
+
+
+def _record_change(changes: dict, course_id: int, lab_exercise_id: int, student_id: int, points: int):
+    changes.setdefault((course_id, lab_exercise_id), {})[student_id] = points
+
+
+def _current_grade(lab_exercise_id: int, student_id: int):
+    return select(StudentPoints.points, StudentPoints.updated_at).where(
+        StudentPoints.lab_exercise_id == lab_exercise_id, StudentPoints.student_id == student_id
+    )
+
+
+async def _grade_context(db, lab_exercise_id: int, student_id: int) -> tuple:
+    current = _current_grade(lab_exercise_id, student_id)
+    lab_exercise = (await db.execute(
+        select(
+            LaboratoryExercise.course_id,
+            LaboratoryExercise.max_points,
+            select(CourseAssignments.id)
+            .where(CourseAssignments.course_id == LaboratoryExercise.course_id,
+                   CourseAssignments.student_id == student_id)
+            .limit(1).scalar_subquery(),
+            current.with_only_columns(StudentPoints.points).scalar_subquery(),
+            current.with_only_columns(StudentPoints.updated_at).scalar_subquery(),
+        ).where(LaboratoryExercise.id == lab_exercise_id)
+    )).first()
+    if lab_exercise is None:
+        raise_lab_exercise_not_found()
+    course_id, max_points, assignment_id, current_points, current_updated_at = lab_exercise
+    if assignment_id is None:
+        raise_student_not_enrolled()
+    return course_id, max_points, current_points, current_updated_at
+
+
+def _grade(lab_exercise_id: int, student_id: int, points: int | None, updated_at) -> dict:
+    return {"lab_exercise_id": lab_exercise_id, "student_id": student_id, "points": points, "updated_at": updated_at}
+
+
+async def read_grade(db, lab_exercise_id: int, student_id: int) -> dict:
+    _, _, points, updated_at = await _grade_context(db, lab_exercise_id, student_id)
+    return _grade(lab_exercise_id, student_id, points, updated_at)
+
+
+async def record_grade(db, lab_exercise_id: int, student_id: int, points: int | None, changes: dict) -> dict:
+    current = _current_grade(lab_exercise_id, student_id)
+    course_id, max_points, current_points, current_updated_at = await _grade_context(db, lab_exercise_id, student_id)
+
+    statement = dialect_insert(db, StudentPoints.__table__)
+    if points is None and current_points is not None:
+        inserted = False
+        points, updated_at = current_points, current_updated_at
+    elif points is None:
+        inserted = (await db.execute(
+            statement.values(lab_exercise_id=lab_exercise_id, student_id=student_id, points=0)
+            .on_conflict_do_nothing(index_elements=GRADE_KEY)
+        )).rowcount
+        if inserted:
+            points, updated_at = 0, None
+        else:
+            points, updated_at = (await db.execute(current)).one()
+    else:
+        if not 0 <= points <= max_points:
+            raise_invalid_points(max_points)
+        inserted = True
+        updated_at = datetime.datetime.utcnow()
+        statement = statement.values(lab_exercise_id=lab_exercise_id, student_id=student_id, points=points,
+                                     updated_at=updated_at)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=GRADE_KEY,
+            set_={"points": statement.excluded.points, "updated_at": statement.excluded.updated_at},
+        ))
+
+    if inserted:
+        await refresh_totals(db, course_id, [student_id])
+        _record_change(changes, course_id, lab_exercise_id, student_id, points)
+
+    return _grade(lab_exercise_id, student_id, points, updated_at)
+
+
+def _utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def sync_grades(db, scans, changes: dict) -> dict:
+    report = {"scans": len(scans), "applied": 0, "conflicts": [], "errors": []}
+    if not scans:
+        return report
+
+    labs = {
+        lab_exercise_id: (course_id, max_points)
+        for lab_exercise_id, course_id, max_points in (await db.execute(
+            select(LaboratoryExercise.id, LaboratoryExercise.course_id, LaboratoryExercise.max_points)
+            .where(LaboratoryExercise.id.in_({scan.lab_exercise_id for scan in scans}))
+        )).all()
+    }
+    enrolled = set((await db.execute(
+        select(CourseAssignments.student_id, CourseAssignments.course_id)
+        .where(CourseAssignments.student_id.in_({scan.student_id for scan in scans}),
+               CourseAssignments.course_id.in_({course_id for course_id, _ in labs.values()}))
+    )).all())
+
+    now = datetime.datetime.utcnow()
+    latest = {}
+    superseded = []
+    placeholders = set()
+    for index, scan in enumerate(scans):
+        key = (scan.lab_exercise_id, scan.student_id)
+        if scan.lab_exercise_id not in labs:
+            report["errors"].append({"index": index, "error": "Lab exercise not found"})
+        elif (scan.student_id, labs[scan.lab_exercise_id][0]) not in enrolled:
+            report["errors"].append({"index": index, "error": "Student is not enrolled in this course"})
+        elif scan.points is None:
+            placeholders.add(key)
+            report["applied"] += 1
+        elif not 0 <= scan.points <= labs[scan.lab_exercise_id][1]:
+            report["errors"].append({"index": index,
+                                     "error": f"points must be between 0 and {labs[scan.lab_exercise_id][1]}"})
+        else:
+            scanned_at = min(_utc(scan.scanned_at), now)
+            previous = latest.get(key)
+            if previous is not None and scanned_at < previous[2]:
+                superseded.append((index, key))
+                continue
+            if previous is not None:
+                superseded.append((previous[0], key))
+            latest[key] = (index, scan.points, scanned_at)
+
+    table = StudentPoints.__table__
+    placeholders -= latest.keys()
+    if placeholders:
+        await db.execute(
+            dialect_insert(db, table)
+            .values([{"lab_exercise_id": lab_exercise_id, "student_id": student_id, "points": 0}
+                     for lab_exercise_id, student_id in placeholders])
+            .on_conflict_do_nothing(index_elements=GRADE_KEY)
+        )
+    if latest:
+        statement = dialect_insert(db, table).values([
+            {"lab_exercise_id": lab_exercise_id, "student_id": student_id, "points": points, "updated_at": scanned_at}
+            for (lab_exercise_id, student_id), (_, points, scanned_at) in latest.items()
+        ])
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=GRADE_KEY,
+            set_={"points": statement.excluded.points, "updated_at": statement.excluded.updated_at},
+            where=or_(table.c.updated_at.is_(None), table.c.updated_at < statement.excluded.updated_at),
+        ))
+
+    keys = placeholders | latest.keys()
+    current = {
+        (lab_exercise_id, student_id): (points, updated_at)
+        for lab_exercise_id, student_id, points, updated_at in (await db.execute(
+            select(StudentPoints.lab_exercise_id, StudentPoints.student_id, StudentPoints.points,
+                   StudentPoints.updated_at)
+            .where(StudentPoints.lab_exercise_id.in_({lab_exercise_id for lab_exercise_id, _ in keys}),
+                   StudentPoints.student_id.in_({student_id for _, student_id in keys}))
+        )).all()
+    } if keys else {}
+
+    refreshed = {}
+    for lab_exercise_id, student_id in placeholders:
+        refreshed.setdefault(labs[lab_exercise_id][0], set()).add(student_id)
+    for (lab_exercise_id, student_id), (index, points, scanned_at) in latest.items():
+        if current[(lab_exercise_id, student_id)] == (points, scanned_at):
+            course_id = labs[lab_exercise_id][0]
+            report["applied"] += 1
+            refreshed.setdefault(course_id, set()).add(student_id)
+            _record_change(changes, course_id, lab_exercise_id, student_id, points)
+        else:
+            superseded.append((index, (lab_exercise_id, student_id)))
+
+    for index, (lab_exercise_id, student_id) in superseded:
+        current_points, current_updated_at = current[(lab_exercise_id, student_id)]
+        report["conflicts"].append({"index": index, "lab_exercise_id": lab_exercise_id, "student_id": student_id,
+                                    "current_points": current_points, "current_updated_at": current_updated_at})
+
+    for course_id, student_ids in refreshed.items():
+        await refresh_totals(db, course_id, student_ids)
+
+    report["errors"].sort(key=lambda error: error["index"])
+    report["conflicts"].sort(key=lambda conflict: conflict["index"])
+    return report
@@ -0,0 +1,61 @@
+import datetime
+import hashlib
+import json
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import IDEMPOTENCY_KEY_TTL_HOURS
+from app.core.exceptions import raise_idempotency_key_reused, raise_invalid_idempotency_key
+from app.models import IdempotencyKey
+
+
+def _expired_before() -> datetime.datetime:
+    return datetime.datetime.utcnow() - datetime.timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def request_fingerprint(method: str, path: str, body) -> str:
+    return hashlib.sha256(json.dumps([method, path, jsonable_encoder(body)], sort_keys=True).encode()).hexdigest()
+
+
+async def _stored_response(db, user_id: int, key: str, fingerprint: str) -> dict | None:
+    record = await db.get(IdempotencyKey, (user_id, key))
+    if record is None:
+        return None
+    if record.created_at < _expired_before():
+        await db.delete(record)
+        await db.flush()
+        return None
+    if record.fingerprint != fingerprint:
+        raise_idempotency_key_reused()
+    return json.loads(record.response)
+
+
+async def run_idempotent(db, user_id: int, key: str | None, fingerprint: str, apply) -> tuple[dict, bool]:
+    if key is not None:
+        if not 0 < len(key) <= 100:
+            raise_invalid_idempotency_key()
+        stored = await _stored_response(db, user_id, key, fingerprint)
+        if stored is not None:
+            return stored, True
+
+    body = jsonable_encoder(await apply())
+    if key is not None:
+        db.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint, response=json.dumps(body),
+                              created_at=datetime.datetime.utcnow()))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        stored = await _stored_response(db, user_id, key, fingerprint) if key is not None else None
+        if stored is None:
+            raise
+        return stored, True
+    return body, False
+
+
+def prune_idempotency_keys(session) -> int:
+    return session.execute(
+        delete(IdempotencyKey.__table__).where(IdempotencyKey.created_at < _expired_before())
+    ).rowcount
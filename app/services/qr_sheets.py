@@ -0,0 +1,287 @@
+import asyncio
+import io
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import QR_SHEET_WORKERS, QR_SHEET_CHUNK_SIZE, QR_SHEET_MAX_ACTIVE_JOBS, \
+    QR_SHEET_JOB_TTL_SECONDS, QR_SHEET_DIR, QR_SHEET_BACKEND, QR_SHEET_STORE_PATH
+from app.core.qr import grading_url, render_qr_png
+
+logger = logging.getLogger(__name__)
+
+SHEET_MEDIA_TYPES = {"pdf": "application/pdf", "zip": "application/zip"}
+PAGE_SIZE = (1240, 1754)
+PAGE_DPI = 150
+PAGE_MARGIN = 60
+GRID = (3, 4)
+QR_SIZE = 300
+_SAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_qr_sheet_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=QR_SHEET_WORKERS)
+        return _executor
+
+
+def shutdown_qr_sheet_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def render_qr_chunk(urls: list[str]) -> list[bytes]:
+    return [render_qr_png(url) for url in urls]
+
+
+def _sheet_pages(entries):
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default(size=26)
+    columns, rows = GRID
+    cell_width = (PAGE_SIZE[0] - 2 * PAGE_MARGIN) // columns
+    cell_height = (PAGE_SIZE[1] - 2 * PAGE_MARGIN) // rows
+    per_page = columns * rows
+
+    for start in range(0, len(entries), per_page):
+        page = Image.new("L", PAGE_SIZE, 255)
+        draw = ImageDraw.Draw(page)
+        for position, (labels, png) in enumerate(entries[start:start + per_page]):
+            left = PAGE_MARGIN + (position % columns) * cell_width
+            top = PAGE_MARGIN + (position // columns) * cell_height
+            with Image.open(io.BytesIO(png)) as code:
+                page.paste(code.convert("L").resize((QR_SIZE, QR_SIZE), Image.NEAREST),
+                           (left + (cell_width - QR_SIZE) // 2, top))
+            for line, label in enumerate(labels):
+                draw.text((left + cell_width // 2, top + QR_SIZE + 10 + line * 32), label, fill=0, font=font,
+                          anchor="ma")
+        yield page
+
+
+def write_pdf(path: str, entries: list[tuple[tuple[str, ...], bytes]]):
+    for number, page in enumerate(_sheet_pages(entries)):
+        page.save(path, format="PDF", resolution=PAGE_DPI, append=number > 0)
+
+
+def write_zip(path: str, entries: list[tuple[tuple[str, ...], bytes]]):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for labels, png in entries:
+            archive.writestr(_SAFE_FILENAME.sub("_", labels[-1]) + ".png", png)
+
+
+SHEET_WRITERS = {"pdf": write_pdf, "zip": write_zip}
+
+
+JOB_FIELDS = ("id", "lab_exercise_id", "format", "owner_id", "status", "total", "rendered", "error", "path",
+              "created_at", "finished_at")
+
+
+class QrSheetJob:
+    def __init__(self, lab_exercise_id: int, sheet_format: str, owner_id: int, total: int):
+        self.id = uuid.uuid4().hex
+        self.lab_exercise_id = lab_exercise_id
+        self.format = sheet_format
+        self.owner_id = owner_id
+        self.status = "queued"
+        self.total = total
+        self.rendered = 0
+        self.error = None
+        self.path = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.task = None
+
+    @classmethod
+    def from_row(cls, row) -> "QrSheetJob":
+        job = cls.__new__(cls)
+        for name, value in zip(JOB_FIELDS, row):
+            setattr(job, name, value)
+        job.task = None
+        return job
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "lab_exercise_id": self.lab_exercise_id,
+            "format": self.format,
+            "status": self.status,
+            "total": self.total,
+            "rendered": self.rendered,
+            "progress": round(self.rendered / self.total, 3) if self.total else 1.0,
+            "error": self.error,
+        }
+
+
+class InProcessJobStore:
+    blocking = False
+
+    def __init__(self):
+        self._jobs = {}
+
+    def save(self, job: QrSheetJob):
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> QrSheetJob | None:
+        return self._jobs.get(job_id)
+
+    def active_count(self, since: float) -> int:
+        return sum(job.active and job.created_at >= since for job in self._jobs.values())
+
+    def prune(self, cutoff: float) -> list[str]:
+        expired = [job for job in self._jobs.values() if not job.active and job.finished_at < cutoff]
+        for job in expired:
+            del self._jobs[job.id]
+        return [job.path for job in expired if job.path]
+
+
+class SqliteJobStore:
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS qr_sheet_jobs (id TEXT PRIMARY KEY, lab_exercise_id INTEGER, format TEXT, "
+            "owner_id INTEGER, status TEXT, total INTEGER, rendered INTEGER, error TEXT, path TEXT, "
+            "created_at REAL, finished_at REAL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def save(self, job: QrSheetJob):
+        placeholders = ", ".join("?" * len(JOB_FIELDS))
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO qr_sheet_jobs ({', '.join(JOB_FIELDS)}) VALUES ({placeholders})",
+            tuple(getattr(job, name) for name in JOB_FIELDS),
+        )
+
+    def get(self, job_id: str) -> QrSheetJob | None:
+        row = self._connection().execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM qr_sheet_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return None if row is None else QrSheetJob.from_row(row)
+
+    def active_count(self, since: float) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM qr_sheet_jobs WHERE status IN ('queued', 'running') AND created_at >= ?", (since,)
+        ).fetchone()[0]
+
+    def prune(self, cutoff: float) -> list[str]:
+        connection = self._connection()
+        expired = "created_at < ? AND (finished_at IS NULL OR finished_at < ?)"
+        paths = [path for path, in connection.execute(
+            f"SELECT path FROM qr_sheet_jobs WHERE {expired} AND path IS NOT NULL", (cutoff, cutoff)
+        )]
+        connection.execute(f"DELETE FROM qr_sheet_jobs WHERE {expired}", (cutoff, cutoff))
+        return paths
+
+
+def create_job_store():
+    if QR_SHEET_BACKEND == "sqlite":
+        return SqliteJobStore(QR_SHEET_STORE_PATH)
+    return InProcessJobStore()
+
+
+job_store = create_job_store()
+
+
+async def _store_call(fn, *args):
+    if job_store.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+def _remove_file(path: str | None):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def _prune_jobs():
+    for path in await _store_call(job_store.prune, time.time() - QR_SHEET_JOB_TTL_SECONDS):
+        _remove_file(path)
+
+
+async def _run_job(job: QrSheetJob, students: list[tuple[int, tuple[str, ...]]]):
+    loop = asyncio.get_running_loop()
+    executor = get_qr_sheet_executor()
+    job.status = "running"
+    try:
+        await _store_call(job_store.save, job)
+
+        async def render(start: int):
+            chunk = students[start:start + QR_SHEET_CHUNK_SIZE]
+            pngs = await loop.run_in_executor(
+                executor, render_qr_chunk, [grading_url(job.lab_exercise_id, student_id) for student_id, _ in chunk]
+            )
+            job.rendered += len(pngs)
+            await _store_call(job_store.save, job)
+            return pngs
+
+        chunks = await asyncio.gather(*(render(start) for start in range(0, len(students), QR_SHEET_CHUNK_SIZE)))
+        pngs = [png for chunk in chunks for png in chunk]
+
+        fd, path = tempfile.mkstemp(dir=QR_SHEET_DIR, prefix=f"qr-sheet-{job.id}-", suffix=f".{job.format}")
+        os.close(fd)
+        job.path = path
+        entries = [(labels, png) for (_, labels), png in zip(students, pngs)]
+        await loop.run_in_executor(executor, SHEET_WRITERS[job.format], path, entries)
+        job.status = "done"
+    except Exception as e:
+        logger.exception("QR sheet job %s failed", job.id)
+        job.status = "failed"
+        job.error = str(e) or type(e).__name__
+        _remove_file(job.path)
+        job.path = None
+    finally:
+        job.finished_at = time.time()
+        await _store_call(job_store.save, job)
+
+
+async def start_qr_sheet_job(lab_exercise_id: int, sheet_format: str, owner_id: int,
+                             students: list[tuple[int, tuple[str, ...]]]) -> QrSheetJob | None:
+    await _prune_jobs()
+    since = time.time() - QR_SHEET_JOB_TTL_SECONDS
+    if await _store_call(job_store.active_count, since) >= QR_SHEET_MAX_ACTIVE_JOBS:
+        return None
+    job = QrSheetJob(lab_exercise_id, sheet_format, owner_id, len(students))
+    await _store_call(job_store.save, job)
+    job.task = asyncio.create_task(_run_job(job, students))
+    return job
+
+
+async def get_qr_sheet_job(job_id: str, owner_id: int) -> QrSheetJob | None:
+    job = await _store_call(job_store.get, job_id)
+    if job is None or job.owner_id != owner_id:
+        return None
+    return job
@@ -0,0 +1,100 @@
+import datetime
+
+from sqlalchemy import select, union_all
+
+from app.core.config import TIMETABLE_SESSION_MINUTES
+from app.core.response_cache import invalidate_on_commit
+from app.models import ArchivedLaboratoryExercise, Course, LaboratoryExercise, TimeDetails
+from app.services.archive import HOT_TABLES, ARCHIVE_TABLES
+
+TIMETABLE_NAMESPACE = "timetable"
+TIMETABLE_MODELS = (Course, LaboratoryExercise, ArchivedLaboratoryExercise, TimeDetails)
+
+
+def timetable_namespaces(student_id: int) -> tuple:
+    return TIMETABLE_NAMESPACE, f"enrollments:{student_id}"
+
+
+async def student_timetable(db, student_id: int) -> list[dict]:
+    query = union_all(*(
+        select(
+            Course.id, Course.code, Course.name,
+            exercises.id, exercises.name, exercises.date_time, exercises.max_points,
+            TimeDetails.group_name, TimeDetails.room, TimeDetails.time,
+        )
+        .select_from(assignments)
+        .join(Course, Course.id == assignments.course_id)
+        .join(exercises, exercises.course_id == assignments.course_id)
+        .join(TimeDetails, TimeDetails.id == assignments.time_details_id)
+        .where(assignments.student_id == student_id)
+        for exercises, assignments, _ in (HOT_TABLES, ARCHIVE_TABLES)
+    ))
+
+    sessions = []
+    for course_id, course_code, course_name, exercise_id, exercise_name, exercise_date, max_points, \
+            group_name, room, time in (await db.execute(query)).all():
+        starts_at = datetime.datetime.combine(exercise_date.date(), time)
+        sessions.append({
+            "course_id": course_id,
+            "course_code": course_code,
+            "course_name": course_name,
+            "exercise_id": exercise_id,
+            "exercise_name": exercise_name,
+            "max_points": max_points,
+            "group_name": group_name,
+            "room": room,
+            "starts_at": starts_at,
+            "ends_at": starts_at + datetime.timedelta(minutes=TIMETABLE_SESSION_MINUTES),
+        })
+    sessions.sort(key=lambda session: (session["starts_at"], session["course_id"], session["exercise_id"]))
+    return sessions
+
+
+def _ics_text(value) -> str:
+    return str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(line: str) -> str:
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    folded, chunk = [], b""
+    for character in line:
+        size = len(character.encode())
+        if len(chunk) + size > (75 if not folded else 74):
+            folded.append(chunk.decode())
+            chunk = b""
+        chunk += character.encode()
+    folded.append(chunk.decode())
+    return "\r\n ".join(folded) + "\r\n"
+
+
+def render_ics(student_id: int, sessions: list[dict]) -> bytes:
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//LabTrack//Timetable//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:LabTrack",
+    ]
+    for session in sessions:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:lab-{session['exercise_id']}-student-{student_id}@labtrack",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{session['starts_at']:%Y%m%dT%H%M%S}",
+            f"DTEND:{session['ends_at']:%Y%m%dT%H%M%S}",
+            f"SUMMARY:{_ics_text(session['course_code'])} {_ics_text(session['exercise_name'])}",
+            f"LOCATION:{_ics_text(session['room'])}",
+            f"DESCRIPTION:{_ics_text(session['course_name'])}\\nGroup {_ics_text(session['group_name'])}\\n"
+            f"Max points: {session['max_points']}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "".join(_ics_line(line) for line in lines).encode()
+
+
+invalidate_on_commit(TIMETABLE_MODELS, lambda instance: (TIMETABLE_NAMESPACE,))
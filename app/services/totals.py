@@ -0,0 +1,96 @@
+from sqlalchemy import delete, func, literal, or_, select, and_
+
+from app.core.database import dialect_insert
+from app.models import Course, LaboratoryExercise, StudentCourseTotals, StudentPoints
+
+TOTALS_COLUMNS = ["student_id", "course_id", "earned_points", "max_points", "graded_count"]
+
+
+def aggregated_totals():
+    return (
+        select(
+            StudentPoints.student_id.label("student_id"),
+            LaboratoryExercise.course_id.label("course_id"),
+            func.sum(StudentPoints.points).label("earned_points"),
+            func.sum(LaboratoryExercise.max_points).label("max_points"),
+            func.count(StudentPoints.id).label("graded_count"),
+        )
+        .join(LaboratoryExercise, LaboratoryExercise.id == StudentPoints.lab_exercise_id)
+        .group_by(StudentPoints.student_id, LaboratoryExercise.course_id)
+    )
+
+
+def refresh_totals_statement(db, course_id: int, student_ids):
+    statement = dialect_insert(db, StudentCourseTotals.__table__).from_select(
+        TOTALS_COLUMNS,
+        aggregated_totals().where(LaboratoryExercise.course_id == course_id,
+                                  StudentPoints.student_id.in_(list(student_ids))),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["student_id", "course_id"],
+        set_={column: statement.excluded[column] for column in TOTALS_COLUMNS[2:]},
+    )
+
+
+async def lock_totals(db, course_id: int, student_ids: list[int]):
+    statement = dialect_insert(db, StudentCourseTotals.__table__).values([
+        {"student_id": student_id, "course_id": course_id, "earned_points": 0, "max_points": 0, "graded_count": 0}
+        for student_id in student_ids
+    ])
+    await db.execute(statement.on_conflict_do_nothing(index_elements=["student_id", "course_id"]))
+    await db.execute(
+        select(StudentCourseTotals.student_id)
+        .where(StudentCourseTotals.course_id == course_id, StudentCourseTotals.student_id.in_(student_ids))
+        .order_by(StudentCourseTotals.student_id)
+        .with_for_update()
+    )
+
+
+async def refresh_totals(db, course_id: int, student_ids):
+    if not student_ids:
+        return
+    # Under READ COMMITTED the aggregate only sees grades committed before it starts, so concurrent writers for
+    # the same student and course take turns on the totals rows. SQLite already serialises writers.
+    if db.bind.dialect.name == "postgresql":
+        await lock_totals(db, course_id, sorted(student_ids))
+    await db.execute(refresh_totals_statement(db, course_id, student_ids))
+
+
+def _hot_course_ids():
+    return select(Course.id).where(Course.archived_at.is_(None))
+
+
+def rebuild_totals(session) -> int:
+    session.execute(
+        delete(StudentCourseTotals.__table__).where(StudentCourseTotals.course_id.in_(_hot_course_ids()))
+    )
+    result = session.execute(StudentCourseTotals.__table__.insert().from_select(TOTALS_COLUMNS, aggregated_totals()))
+    return result.rowcount
+
+
+def verify_totals(session) -> list[dict]:
+    expected = aggregated_totals().subquery()
+    totals = StudentCourseTotals.__table__
+    joined_on = and_(totals.c.student_id == expected.c.student_id, totals.c.course_id == expected.c.course_id)
+
+    mismatched = session.execute(
+        select(expected, totals.c.earned_points.label("stored_earned_points"),
+               totals.c.max_points.label("stored_max_points"), totals.c.graded_count.label("stored_graded_count"))
+        .outerjoin(totals, joined_on)
+        .where(or_(totals.c.student_id.is_(None),
+                   totals.c.earned_points != expected.c.earned_points,
+                   totals.c.max_points != expected.c.max_points,
+                   totals.c.graded_count != expected.c.graded_count))
+    ).mappings().all()
+
+    orphaned = session.execute(
+        select(totals.c.student_id, totals.c.course_id, literal(None).label("earned_points"),
+               literal(None).label("max_points"), literal(None).label("graded_count"),
+               totals.c.earned_points.label("stored_earned_points"),
+               totals.c.max_points.label("stored_max_points"), totals.c.graded_count.label("stored_graded_count"))
+        .outerjoin(expected, joined_on)
+        .where(expected.c.student_id.is_(None), totals.c.graded_count > 0,
+               totals.c.course_id.in_(_hot_course_ids()))
+    ).mappings().all()
+
+    return [dict(row) for row in [*mismatched, *orphaned]]
@@ -0,0 +1,429 @@
+"""Drive every Lab Track endpoint with concurrent authenticated clients and report latency, throughput and DB queries.
+
+Seeds a scratch SQLite database by default and runs the app in-process:
+
+    python -m benchmarks.load --students 2000 --requests 200 --concurrency 16 --output results.json
+    python -m benchmarks.load --compare baseline.json --output results.json
+
+Pass --database-url to use another (empty) database, e.g. a local Postgres, and --base-url to load an
+already running server instead (DB query counts are then not available).
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from benchmarks.seed import PASSWORD, ROOT, add_scale_arguments, scale_from_args, seed_database
+
+
+STREAMING_ROUTES = {("GET", "/student/{course_id}/events")}
+JOB_ROUTES = {("GET", "/qr-sheets/{job_id}"), ("GET", "/qr-sheets/{job_id}/download")}
+UNWARMED_SCENARIOS = ("change_password", "qr_sheet")
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    role: str | None
+    build: callable
+    max_requests: int | None = None
+
+
+@dataclass
+class Dataset:
+    course_ids: list
+    student_ids: list
+    enrollments: list
+    exercises_by_course: dict
+    time_details_ids: list
+    usernames: dict = field(default_factory=dict)
+    tokens: dict = field(default_factory=dict)
+    feed_urls: dict = field(default_factory=dict)
+    sampled_students: list = field(default_factory=list)
+    password_users: list = field(default_factory=list)
+
+
+def _load_dataset(database_url: str) -> Dataset:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        exercises_by_course = {}
+        for exercise_id, course_id in connection.execute(text("SELECT id, course_id FROM laboratory_exercises")):
+            exercises_by_course.setdefault(course_id, []).append(exercise_id)
+        dataset = Dataset(
+            course_ids=[row[0] for row in connection.execute(text("SELECT id FROM courses ORDER BY id"))],
+            student_ids=[row[0] for row in connection.execute(
+                text("SELECT id FROM users WHERE role = 'STUDENT' ORDER BY id"))],
+            enrollments=[tuple(row) for row in connection.execute(
+                text("SELECT student_id, course_id FROM course_assignments ORDER BY id"))],
+            exercises_by_course=exercises_by_course,
+            time_details_ids=[row[0] for row in connection.execute(text("SELECT id FROM time_details"))],
+            usernames=dict(connection.execute(text("SELECT id, username FROM users")).all()),
+        )
+    engine.dispose()
+    return dataset
+
+
+def _student_token(dataset: Dataset, student_id: int) -> str:
+    return dataset.tokens[dataset.usernames[student_id]]
+
+
+def _grade_csv(dataset: Dataset, rng: random.Random, course_id: int) -> bytes:
+    students = [student_id for student_id, enrolled_course in dataset.enrollments if enrolled_course == course_id]
+    lines = ["student_id,points", *(f"{student_id},{rng.randint(0, 10)}" for student_id in students)]
+    return "\n".join(lines).encode()
+
+
+def scenarios(dataset: Dataset) -> list[Scenario]:
+    sampled = set(dataset.sampled_students)
+    sampled_enrollments = [enrollment for enrollment in dataset.enrollments if enrollment[0] in sampled]
+
+    def enrolled_student(rng, logged_in=False):
+        student_id, course_id = rng.choice(sampled_enrollments if logged_in else dataset.enrollments)
+        return student_id, course_id, rng.choice(dataset.exercises_by_course[course_id])
+
+    def as_student(student_id):
+        return {"Authorization": f"Bearer {_student_token(dataset, student_id)}"}
+
+    def student_get(path_for):
+        def build(rng, i):
+            student_id, course_id, exercise_id = enrolled_student(rng, logged_in=True)
+            return {"url": path_for(student_id, course_id, exercise_id), "headers": as_student(student_id)}
+        return build
+
+    def staff_get(path_for):
+        def build(rng, i):
+            student_id, course_id, exercise_id = enrolled_student(rng)
+            return {"url": path_for(student_id, course_id, exercise_id)}
+        return build
+
+    def login(rng, i):
+        student_id = rng.choice(dataset.sampled_students)
+        return {"json": {"username": dataset.usernames[student_id], "password": PASSWORD}, "url": "/login"}
+
+    def change_password(rng, i):
+        username = dataset.password_users[i]
+        return {"url": "/change-password", "headers": {"Authorization": f"Bearer {dataset.tokens[username]}"},
+                "json": {"current_password": PASSWORD, "new_password": PASSWORD + "-changed",
+                         "confirm_password": PASSWORD + "-changed"}}
+
+    def enroll(rng, i):
+        return {"url": f"/courses/{rng.choice(dataset.course_ids)}/enroll",
+                "params": {"user_id": rng.choice(dataset.student_ids)}}
+
+    def enroll_batch(rng, i):
+        return {"url": f"/courses/{rng.choice(dataset.course_ids)}/enroll/batch",
+                "json": {"groups": [{"time_details_id": rng.choice(dataset.time_details_ids),
+                                     "user_ids": rng.sample(dataset.student_ids, 25)}]}}
+
+    def grade_post(rng, i):
+        student_id, course_id, exercise_id = enrolled_student(rng)
+        return {"url": f"/grade/{exercise_id}/{student_id}", "json": {"points": rng.randint(0, 10)},
+                "headers": {"Idempotency-Key": f"benchmark-{i}-{rng.random()}"}}
+
+    def grade_sync(rng, i):
+        scanned_at = datetime.datetime.utcnow().isoformat()
+        scans = []
+        for _ in range(50):
+            student_id, course_id, exercise_id = enrolled_student(rng)
+            scans.append({"lab_exercise_id": exercise_id, "student_id": student_id, "points": rng.randint(0, 10),
+                          "scanned_at": scanned_at})
+        return {"url": "/grade/sync", "json": {"scans": scans}}
+
+    def grade_import(rng, i):
+        course_id = rng.choice(dataset.course_ids)
+        return {"url": f"/lab-exercises/{rng.choice(dataset.exercises_by_course[course_id])}/grades/import",
+                "headers": {"Content-Type": "text/csv"}, "content": _grade_csv(dataset, rng, course_id)}
+
+    return [
+        Scenario("login", "POST", "/login", None, login),
+        Scenario("students", "GET", "/students", "PROFESSOR",
+                 lambda rng, i: {"url": "/students", "params": {"limit": 100}}),
+        Scenario("user", "GET", "/users/{user_id}", "PROFESSOR", staff_get(lambda s, c, e: f"/users/{s}")),
+        Scenario("user_photo", "GET", "/users/{user_id}/photo", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/users/{s}/photo?size=64")),
+        Scenario("courses", "GET", "/courses", None, lambda rng, i: {"url": "/courses", "params": {"limit": 100}}),
+        Scenario("student_course", "GET", "/student/{course_id}", "STUDENT",
+                 student_get(lambda s, c, e: f"/student/{c}")),
+        Scenario("course_students", "GET", "/courses/{course_id}/students", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/courses/{c}/students")),
+        Scenario("course_gradebook", "GET", "/courses/{course_id}/gradebook", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/courses/{c}/gradebook")),
+        Scenario("course_grades_export", "GET", "/courses/{course_id}/grades/export", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/courses/{c}/grades/export")),
+        Scenario("course_leaderboard", "GET", "/courses/{course_id}/leaderboard", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/courses/{c}/leaderboard")),
+        Scenario("enroll", "POST", "/courses/{course_id}/enroll", "PROFESSOR", enroll),
+        Scenario("enroll_batch", "POST", "/courses/{course_id}/enroll/batch", "PROFESSOR", enroll_batch),
+        Scenario("user_courses", "GET", "/course/{user_id}", "PROFESSOR", staff_get(lambda s, c, e: f"/course/{s}")),
+        Scenario("my_courses", "GET", "/my-courses", "STUDENT", student_get(lambda s, c, e: "/my-courses")),
+        Scenario("my_timetable", "GET", "/my-timetable", "STUDENT", student_get(lambda s, c, e: "/my-timetable")),
+        Scenario("my_timetable_feed", "GET", "/my-timetable/feed", "STUDENT",
+                 student_get(lambda s, c, e: "/my-timetable/feed")),
+        Scenario("timetable_feed", "GET", "/timetable.ics", None,
+                 lambda rng, i: {"url": dataset.feed_urls[rng.choice(dataset.sampled_students)]}),
+        Scenario("student_courses_exercises", "GET", "/student/{student_id}/courses-exercises", "STUDENT",
+                 student_get(lambda s, c, e: f"/student/{s}/courses-exercises")),
+        Scenario("generate_qr", "GET", "/generate_qr/{lab_exercise_id}/{student_id}", None,
+                 staff_get(lambda s, c, e: f"/generate_qr/{e}/{s}?format=png")),
+        Scenario("scan", "GET", "/scan/{lab_exercise_id}/{student_id}", None,
+                 staff_get(lambda s, c, e: f"/scan/{e}/{s}")),
+        Scenario("grade", "GET", "/grade/{lab_exercise_id}/{student_id}", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/grade/{e}/{s}")),
+        Scenario("grade_post", "POST", "/grade/{lab_exercise_id}/{student_id}", "PROFESSOR", grade_post),
+        Scenario("grade_sync", "POST", "/grade/sync", "PROFESSOR", grade_sync, max_requests=50),
+        Scenario("grades_import", "POST", "/lab-exercises/{lab_exercise_id}/grades/import", "PROFESSOR",
+                 grade_import, max_requests=50),
+        Scenario("qr_sheet", "POST", "/lab-exercises/{lab_exercise_id}/qr-sheets", "PROFESSOR",
+                 staff_get(lambda s, c, e: f"/lab-exercises/{e}/qr-sheets"), max_requests=4),
+        Scenario("change_password", "POST", "/change-password", "STUDENT", change_password, max_requests=20),
+        Scenario("stats_cache", "GET", "/stats/cache", "PROFESSOR", lambda rng, i: {"url": "/stats/cache"}),
+        Scenario("stats_hashing", "GET", "/stats/hashing", "PROFESSOR", lambda rng, i: {"url": "/stats/hashing"}),
+        Scenario("stats_admission", "GET", "/stats/admission", "PROFESSOR",
+                 lambda rng, i: {"url": "/stats/admission"}),
+        Scenario("metrics", "GET", "/metrics", None, lambda rng, i: {"url": "/metrics"}),
+    ]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def attach(self):
+        from sqlalchemy import event
+        from app.core import database
+
+        for engine in (database.engine, database.async_engine.sync_engine if database.async_engine else None):
+            if engine is not None:
+                event.listen(engine, "before_cursor_execute", self)
+
+
+async def _login(client, username: str) -> str:
+    response = await client.post("/login", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _feed_url(client, token: str) -> str:
+    response = await client.get("/my-timetable/feed", headers={"Authorization": f"Bearer {token}"})
+    response.raise_for_status()
+    return response.json()["url"]
+
+
+async def _check_scan_flow(client, dataset: Dataset) -> dict:
+    from app.core.qr import grading_url
+
+    student_id, course_id = dataset.enrollments[0]
+    exercise_id = dataset.exercises_by_course[course_id][0]
+    scan_path = urllib.parse.urlsplit(grading_url(exercise_id, student_id)).path
+    page = await client.get(scan_path)
+    if page.status_code != 200 or "../../grade/" not in page.text:
+        raise RuntimeError(f"QR code URL {scan_path} does not serve the scan page ({page.status_code})")
+
+    grade_path = urllib.parse.urljoin(scan_path, f"../../grade/{exercise_id}/{student_id}")
+    headers = {"Authorization": f"Bearer {dataset.tokens['professor1']}"}
+    (await client.post(grade_path, json={}, headers=headers)).raise_for_status()
+    grade = (await client.get(grade_path, headers=headers)).json()
+    if grade.get("points") is None:
+        raise RuntimeError(f"Scanning {scan_path} did not record a grade: {grade}")
+    return grade
+
+
+async def _run_scenario(client, scenario: Scenario, dataset: Dataset, requests: int, concurrency: int,
+                        warmup: int, counter: QueryCounter | None, seed: int) -> dict:
+    rng = random.Random(seed)
+    requests = min(requests, scenario.max_requests or requests)
+    default_headers = {}
+    if scenario.role == "PROFESSOR":
+        default_headers["Authorization"] = f"Bearer {dataset.tokens['professor1']}"
+
+    async def send(i: int):
+        spec = scenario.build(rng, i)
+        headers = {**default_headers, **spec.pop("headers", {})}
+        started = time.perf_counter()
+        response = await client.request(scenario.method, spec.pop("url"), headers=headers, **spec)
+        return time.perf_counter() - started, response.status_code
+
+    if scenario.name not in UNWARMED_SCENARIOS:
+        for i in range(warmup):
+            await send(i)
+
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            latency, status = await send(queue.get_nowait())
+            latencies.append(latency)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    queries_before = counter.count if counter else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": requests,
+        "statuses": statuses,
+        "errors": sum(count for status, count in statuses.items() if int(status) >= 500),
+        "throughput_rps": requests / elapsed,
+        "latency_ms": {"mean": float(latencies_ms.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+                       "max": float(latencies_ms.max())},
+        "db_queries_per_request": (counter.count - queries_before) / requests if counter else None,
+    }
+
+
+def _uncovered_routes(app, covered: set) -> list:
+    from fastapi.routing import APIRoute
+
+    return sorted(
+        f"{method} {route.path}" for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods if (method, route.path) not in covered
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    import httpx
+
+    dataset = _load_dataset(args.database_url)
+    rng = random.Random(args.seed)
+    dataset.sampled_students = rng.sample(dataset.student_ids[:-20], min(20, len(dataset.student_ids) - 20))
+    dataset.password_users = [dataset.usernames[student_id] for student_id in dataset.student_ids[-20:]]
+
+    counter = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        app = None
+    else:
+        from main import app
+
+        counter = QueryCounter()
+        counter.attach()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://benchmark", timeout=60)
+
+    results = {}
+    async with contextlib.AsyncExitStack() as stack:
+        if app is not None:
+            await stack.enter_async_context(app.router.lifespan_context(app))
+        await stack.enter_async_context(client)
+        usernames = ["professor1", *(dataset.usernames[s] for s in dataset.sampled_students), *dataset.password_users]
+        for username in usernames:
+            dataset.tokens[username] = await _login(client, username)
+        for student_id in dataset.sampled_students:
+            dataset.feed_urls[student_id] = await _feed_url(client, _student_token(dataset, student_id))
+
+        print("scan flow records grades:", await _check_scan_flow(client, dataset))
+
+        all_scenarios = scenarios(dataset)
+        selected = [scenario for scenario in all_scenarios if not args.only or scenario.name in args.only]
+        for scenario in selected:
+            results[scenario.name] = await _run_scenario(client, scenario, dataset, args.requests, args.concurrency,
+                                                         args.warmup, counter, args.seed)
+            result = results[scenario.name]
+            print(f"{scenario.name:<26} {result['throughput_rps']:8.1f} req/s  "
+                  f"p50 {result['latency_ms']['p50']:7.1f}  p95 {result['latency_ms']['p95']:7.1f}  "
+                  f"p99 {result['latency_ms']['p99']:7.1f} ms  "
+                  f"queries/req {result['db_queries_per_request'] if counter else '-'}  {result['statuses']}")
+
+    if app is not None and not args.only:
+        covered = {(s.method, s.route) for s in all_scenarios} | STREAMING_ROUTES | JOB_ROUTES
+        for route in _uncovered_routes(app, covered):
+            print(f"warning: no benchmark scenario for {route}", file=sys.stderr)
+
+    return results
+
+
+def _compare(results: dict, baseline: dict):
+    print("\nendpoint                   p95 ms (base -> now)        req/s (base -> now)")
+    for name, result in results.items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        print(f"{name:<26} {before['latency_ms']['p95']:8.1f} -> {result['latency_ms']['p95']:8.1f} "
+              f"({result['latency_ms']['p95'] / before['latency_ms']['p95'] - 1:+.0%})   "
+              f"{before['throughput_rps']:8.1f} -> {result['throughput_rps']:8.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="empty database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded --database-url")
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per endpoint")
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    add_scale_arguments(parser)
+    args = parser.parse_args(argv)
+
+    args.database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/labtrack-bench.sqlite"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("RATE_LIMITS", "")
+
+    scale = scale_from_args(args)
+    if not args.no_seed:
+        print(seed_database(args.database_url, scale))
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": args.database_url.split("://")[0],
+            "target": args.base_url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "scale": asdict(scale),
+        },
+        "endpoints": results,
+    }
+
+    if args.compare:
+        with open(args.compare) as f:
+            _compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Compare query plans of the hot lookup paths before and after the index migration.
+
+Runs against an empty scratch database (a temporary SQLite file by default):
+
+    python -m benchmarks.query_plans [--database-url postgresql://.../scratch]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOT_QUERIES = {
+    "student_points by lab exercise and student": (
+        "SELECT points FROM student_points WHERE lab_exercise_id = :lab_exercise_id AND student_id = :student_id",
+        {"lab_exercise_id": 3, "student_id": 7},
+    ),
+    "course_assignments by course and student": (
+        "SELECT id FROM course_assignments WHERE course_id = :course_id AND student_id = :student_id",
+        {"course_id": 2, "student_id": 7},
+    ),
+    "course_assignments by student": (
+        "SELECT course_id, time_details_id FROM course_assignments WHERE student_id = :student_id",
+        {"student_id": 7},
+    ),
+    "laboratory_exercises by course": (
+        "SELECT id, name FROM laboratory_exercises WHERE course_id = :course_id",
+        {"course_id": 2},
+    ),
+    "users by role": (
+        "SELECT id, username FROM users WHERE role = :role",
+        {"role": "PROFESSOR"},
+    ),
+}
+
+
+def _seed(connection, students: int = 2000, courses: int = 40, exercises_per_course: int = 10):
+    connection.execute(
+        text("INSERT INTO users (id, username, password, name, surname, role) VALUES (:id, :u, 'x', 'n', 's', :r)"),
+        [{"id": i, "u": f"user{i}", "r": "PROFESSOR" if i % 100 == 0 else "STUDENT"} for i in range(1, students + 1)],
+    )
+    connection.execute(
+        text("INSERT INTO courses (id, name, code, semester) VALUES (:id, :n, :c, :s)"),
+        [{"id": i, "n": f"Course {i}", "c": f"C{i}", "s": i % 8 + 1} for i in range(1, courses + 1)],
+    )
+    connection.execute(text("INSERT INTO time_details (id, group_name, room, time) VALUES (1, 'G1', 'R1', '09:00:00')"))
+    connection.execute(
+        text("INSERT INTO laboratory_exercises (id, course_id, name, date_time, max_points) "
+             "VALUES (:id, :c, :n, :d, 10)"),
+        [{"id": i, "c": i % courses + 1, "n": f"Lab {i}", "d": datetime.datetime(2026, 1, 1)}
+         for i in range(1, courses * exercises_per_course + 1)],
+    )
+    connection.execute(
+        text("INSERT INTO course_assignments (student_id, course_id, time_details_id) VALUES (:s, :c, 1)"),
+        [{"s": s, "c": c} for s in range(1, students + 1) for c in range(s % courses + 1, s % courses + 4)
+         if c <= courses],
+    )
+    connection.execute(
+        text("INSERT INTO student_points (lab_exercise_id, student_id, points) VALUES (:l, :s, 5)"),
+        [{"l": l, "s": s} for s in range(1, students + 1) for l in range(s % 50 + 1, s % 50 + 6)],
+    )
+    connection.execute(text("ANALYZE"))
+
+
+def _explain(connection, sql: str, params: dict) -> str:
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in connection.execute(text(f"EXPLAIN {sql}"), params))
+
+
+def _plans(engine) -> dict:
+    with engine.connect() as connection:
+        return {name: _explain(connection, sql, params) for name, (sql, params) in HOT_QUERIES.items()}
+
+
+def _uses_index(plan: str) -> bool:
+    return "USING INDEX" in plan or "USING COVERING INDEX" in plan or "Index Scan" in plan or "Index Only Scan" in plan
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="empty scratch database to run against")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/query_plans.sqlite"
+    os.environ.setdefault("DATABASE_URL", database_url)
+    engine = create_engine(database_url)
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", database_url)
+
+    command.upgrade(config, "0001")
+    with engine.begin() as connection:
+        _seed(connection)
+    before = _plans(engine)
+
+    command.upgrade(config, "head")
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    after = _plans(engine)
+
+    failures = 0
+    for name in HOT_QUERIES:
+        uses_index = _uses_index(after[name])
+        failures += not uses_index
+        print(f"== {name}: {'uses index' if uses_index else 'NO INDEX USED'}")
+        print(f"-- before\n{before[name]}\n-- after\n{after[name]}\n")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Populate an empty database with a synthetic Lab Track dataset.
+
+    python -m benchmarks.seed --database-url sqlite:////tmp/labtrack-bench.sqlite --students 2000
+"""
+import argparse
+import datetime
+import io
+import os
+import random
+import sys
+from dataclasses import asdict, dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "password"
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Scale:
+    courses: int = 50
+    students: int = 2000
+    professors: int = 10
+    assistants: int = 20
+    groups: int = 8
+    exercises_per_course: int = 10
+    courses_per_student: int = 4
+    graded_ratio: float = 0.7
+    photos: bool = True
+    seed: int = 1234
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser):
+    defaults = Scale()
+    for field, value in asdict(defaults).items():
+        flag = "--" + field.replace("_", "-")
+        if isinstance(value, bool):
+            parser.add_argument(flag, action=argparse.BooleanOptionalAction, default=value)
+        else:
+            parser.add_argument(flag, type=type(value), default=value)
+
+
+def scale_from_args(args) -> Scale:
+    return Scale(**{field: getattr(args, field) for field in asdict(Scale())})
+
+
+def _photo() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 320), (90, 140, 200)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _insert(connection, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+
+def seed_database(database_url: str, scale: Scale) -> dict:
+    os.environ["DATABASE_URL"] = database_url
+
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    command.upgrade(config, "head")
+
+    from app.core.database import Base
+    from app.core.jwt.hashing import hash_password
+    from app.services.totals import rebuild_totals
+    from sqlalchemy.orm import Session
+
+    tables = Base.metadata.tables
+    rng = random.Random(scale.seed)
+    password = hash_password(PASSWORD)
+    photo = _photo() if scale.photos else None
+
+    users = []
+    for role, prefix, count in (("PROFESSOR", "professor", scale.professors),
+                                ("ASSISTANT", "assistant", scale.assistants),
+                                ("STUDENT", "student", scale.students)):
+        for i in range(1, count + 1):
+            users.append({
+                "id": len(users) + 1, "username": f"{prefix}{i}", "password": password,
+                "name": f"{prefix.title()} {i}", "surname": f"Surname{i}", "role": role,
+                "photo": photo if role == "STUDENT" else None,
+            })
+    staff_count = scale.professors + scale.assistants
+    student_ids = [user["id"] for user in users[staff_count:]]
+
+    courses = [{"id": i, "name": f"Course {i}", "code": f"C{i:04d}", "semester": i % 8 + 1}
+               for i in range(1, scale.courses + 1)]
+    time_details = [{"id": i, "group_name": f"G{i}", "room": f"Lab {100 + i}", "time": datetime.time(8 + i % 10)}
+                    for i in range(1, scale.groups + 1)]
+    professor_courses = [{"professor_id": (course["id"] - 1) % scale.professors + 1, "course_id": course["id"]}
+                         for course in courses]
+
+    exercises = []
+    for course in courses:
+        for week in range(scale.exercises_per_course):
+            exercises.append({
+                "id": len(exercises) + 1, "course_id": course["id"], "name": f"Lab {week + 1}",
+                "date_time": datetime.datetime(2026, 10, 5, 9) + datetime.timedelta(weeks=week, days=course["id"] % 5),
+                "max_points": 10,
+            })
+    exercises_by_course = {}
+    for exercise in exercises:
+        exercises_by_course.setdefault(exercise["course_id"], []).append(exercise["id"])
+
+    assignments = []
+    points = []
+    for student_id in student_ids:
+        for course_id in rng.sample(range(1, scale.courses + 1), min(scale.courses_per_student, scale.courses)):
+            assignments.append({"student_id": student_id, "course_id": course_id,
+                                "time_details_id": rng.randint(1, scale.groups)})
+            for exercise_id in exercises_by_course[course_id]:
+                if rng.random() < scale.graded_ratio:
+                    points.append({"lab_exercise_id": exercise_id, "student_id": student_id,
+                                   "points": rng.randint(0, 10)})
+
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        _insert(connection, tables["users"], users)
+        _insert(connection, tables["courses"], courses)
+        _insert(connection, tables["time_details"], time_details)
+        _insert(connection, tables["professor_courses"], professor_courses)
+        _insert(connection, tables["laboratory_exercises"], exercises)
+        _insert(connection, tables["course_assignments"], assignments)
+        _insert(connection, tables["student_points"], points)
+
+    with Session(engine) as session, session.begin():
+        rebuild_totals(session)
+    engine.dispose()
+
+    return {
+        "users": len(users),
+        "students": len(student_ids),
+        "courses": len(courses),
+        "laboratory_exercises": len(exercises),
+        "course_assignments": len(assignments),
+        "student_points": len(points),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="empty database to populate")
+    add_scale_arguments(parser)
+    args = parser.parse_args(argv)
+
+    counts = seed_database(args.database_url, scale_from_args(args))
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Measure the per-row cost of the list endpoint serialization paths.
+
+    python -m benchmarks.serialization [--rows 10000] [--repeat 5] [--output results.json]
+"""
+import argparse
+import json
+import sys
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+
+from app.core.serialization import rows_to_dicts
+from app.schemas.course_schema import COURSE_RESPONSE_FIELDS, CourseResponse, course_list_adapter
+
+
+def _course_rows(count: int):
+    metadata = MetaData()
+    courses = Table(
+        "courses", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(255)),
+        Column("code", String(30)),
+        Column("semester", Integer),
+    )
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(courses.insert(), [
+            {"id": i, "name": f"Course number {i}", "code": f"C{i:06d}", "semester": i % 8 + 1}
+            for i in range(1, count + 1)
+        ])
+        return connection.execute(select(courses.c.id, courses.c.name, courses.c.code, courses.c.semester)).all()
+
+
+def per_row_model_validate(rows) -> bytes:
+    return JSONResponse(jsonable_encoder([CourseResponse.model_validate(row) for row in rows])).body
+
+
+def list_type_adapter(rows) -> bytes:
+    return JSONResponse(jsonable_encoder(course_list_adapter.validate_python(rows, from_attributes=True))).body
+
+
+def fast_orjson(rows) -> bytes:
+    return orjson.dumps(rows_to_dicts(rows, COURSE_RESPONSE_FIELDS))
+
+
+PATHS = {
+    "per_row_model_validate": per_row_model_validate,
+    "list_type_adapter": list_type_adapter,
+    "fast_orjson": fast_orjson,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    rows = _course_rows(args.rows)
+    expected = json.loads(per_row_model_validate(rows))
+
+    results = {"rows": args.rows, "paths": {}}
+    for name, serialize in PATHS.items():
+        if json.loads(serialize(rows)) != expected:
+            print(f"{name} produces a different payload", file=sys.stderr)
+            return 1
+        best = min(timeit.repeat(lambda: serialize(rows), number=1, repeat=args.repeat))
+        results["paths"][name] = {"total_ms": best * 1000, "per_row_us": best * 1e6 / args.rows}
+
+    baseline = results["paths"]["per_row_model_validate"]["per_row_us"]
+    for name, result in results["paths"].items():
+        result["speedup"] = baseline / result["per_row_us"]
+        print(f"{name:<24} {result['per_row_us']:8.2f} us/row  {result['speedup']:5.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Measure import time, warm-up time and time-to-first-response of the app in fresh interpreters.
+
+    python -m benchmarks.startup [--runs 5] [--database-url postgresql://.../scratch] [--output startup.json]
+
+Each run starts a new Python process, imports the app, runs the lifespan start-up (with and without the warm-up) and
+times the first request to a handful of endpoints that touch the database, QR rendering, photos and numpy.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import ROOT, Scale, seed_database
+
+FIRST_REQUESTS = (
+    ("courses", "/courses", None),
+    ("my_courses", "/my-courses", "student"),
+    ("gradebook", "/courses/1/gradebook", "professor"),
+    ("photo", "/users/{student_id}/photo?size=64", "professor"),
+    ("generate_qr", "/generate_qr/1/{student_id}?format=png", None),
+)
+
+
+async def _child() -> dict:
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+
+    import httpx
+    from sqlalchemy import text
+
+    from app.core.database import engine
+    from app.core.jwt.security import create_access_token
+
+    timings = {"import_ms": import_ms}
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup_ms"] = (time.perf_counter() - started) * 1000
+
+        with engine.connect() as connection:
+            student_id, student = connection.execute(
+                text("SELECT ca.student_id, u.username FROM course_assignments ca "
+                     "JOIN users u ON u.id = ca.student_id WHERE ca.course_id = 1 ORDER BY ca.id")
+            ).first()
+        tokens = {"professor": create_access_token({"sub": "professor1"}, "PROFESSOR"),
+                  "student": create_access_token({"sub": student}, "STUDENT")}
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            for name, url, role in FIRST_REQUESTS:
+                headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+                started = time.perf_counter()
+                response = await client.get(url.format(student_id=student_id), headers=headers)
+                timings[f"first_{name}_ms"] = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    timings[f"first_{name}_status"] = response.status_code
+    timings["first_response_total_ms"] = sum(
+        value for key, value in timings.items() if key.startswith("first_") and key.endswith("_ms")
+    )
+    return timings
+
+
+def _run_child(database_url: str, warmup: bool) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url, "STARTUP_WARMUP": "true" if warmup else "false"}
+    env.setdefault("SECRET_KEY", "benchmark-secret")
+    env.setdefault("ALGORITHM", "HS256")
+    output = subprocess.check_output([sys.executable, "-m", "benchmarks.startup", "--child"], cwd=ROOT, env=env,
+                                     text=True, stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _summarize(runs: list[dict]) -> dict:
+    keys = [key for key in runs[0] if key.endswith("_ms")]
+    return {key: {"median": round(statistics.median(run[key] for run in runs), 1),
+                  "min": round(min(run[key] for run in runs), 1)} for key in keys}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="empty database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded --database-url")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child())))
+        return 0
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/labtrack-startup.sqlite"
+    if not args.no_seed:
+        seed_database(database_url, Scale(courses=10, students=200, professors=2, assistants=2))
+
+    results = {}
+    for warmup in (False, True):
+        mode = "warm-up" if warmup else "no warm-up"
+        results[mode] = _summarize([_run_child(database_url, warmup) for _ in range(args.runs)])
+        print(f"{mode}:")
+        for key, value in results[mode].items():
+            print(f"  {key:<28} median {value['median']:8.1f}   min {value['min']:8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": args.runs, "database": database_url.split("://")[0], "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
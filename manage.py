@@ -0,0 +1,88 @@
+import argparse
+import sys
+
+import app.models  # noqa: F401
+import app.models.professor_courses  # noqa: F401
+from app.core.config import ARCHIVE_BATCH_SIZE
+from app.core.database import SessionLocal
+from app.services.archive import archive_semester, restore_semester
+from app.services.idempotency import prune_idempotency_keys
+from app.services.totals import rebuild_totals, verify_totals
+
+
+def cmd_rebuild_totals(args) -> int:
+    with SessionLocal() as session:
+        with session.begin():
+            rows = rebuild_totals(session)
+        print(f"Rebuilt {rows} student course totals")
+        mismatches = verify_totals(session)
+    print("Verified" if not mismatches else f"{len(mismatches)} totals still differ after rebuild")
+    return 1 if mismatches else 0
+
+
+def cmd_verify_totals(args) -> int:
+    with SessionLocal() as session:
+        mismatches = verify_totals(session)
+    for mismatch in mismatches[:args.show]:
+        print(mismatch)
+    print(f"{len(mismatches)} student course totals differ from student_points")
+    return 1 if mismatches else 0
+
+
+def _print_moved(courses: list[dict], verb: str):
+    for course in courses:
+        print(f"{verb} course {course['course_id']}: {course['exercises']} exercises, "
+              f"{course['assignments']} enrollments, {course['points']} grades")
+    print(f"{verb} {len(courses)} courses")
+
+
+def cmd_archive_semester(args) -> int:
+    with SessionLocal() as session:
+        _print_moved(archive_semester(session, args.semester, args.batch_size), "Archived")
+    return 0
+
+
+def cmd_restore_semester(args) -> int:
+    with SessionLocal() as session:
+        _print_moved(restore_semester(session, args.semester, args.batch_size), "Restored")
+    return 0
+
+
+def cmd_prune_idempotency_keys(args) -> int:
+    with SessionLocal() as session:
+        with session.begin():
+            rows = prune_idempotency_keys(session)
+    print(f"Deleted {rows} expired idempotency keys")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lab Track maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-totals", help="recompute student_course_totals from student_points")
+    rebuild.set_defaults(handler=cmd_rebuild_totals)
+
+    verify = subparsers.add_parser("verify-totals", help="compare student_course_totals with student_points")
+    verify.add_argument("--show", type=int, default=20, help="number of mismatches to print")
+    verify.set_defaults(handler=cmd_verify_totals)
+
+    archive = subparsers.add_parser("archive-semester", help="move a closed semester into the archive tables")
+    archive.add_argument("semester", type=int)
+    archive.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="rows moved per transaction")
+    archive.set_defaults(handler=cmd_archive_semester)
+
+    restore = subparsers.add_parser("restore-semester", help="move an archived semester back into the live tables")
+    restore.add_argument("semester", type=int)
+    restore.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="rows moved per transaction")
+    restore.set_defaults(handler=cmd_restore_semester)
+
+    prune = subparsers.add_parser("prune-idempotency-keys", help="delete idempotency keys older than the TTL")
+    prune.set_defaults(handler=cmd_prune_idempotency_keys)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
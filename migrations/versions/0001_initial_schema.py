@@ -0,0 +1,86 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("password", sa.String(60), nullable=False),
+        sa.Column("name", sa.String(50), nullable=True),
+        sa.Column("surname", sa.String(50), nullable=True),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("photo", sa.LargeBinary(), nullable=True),
+    )
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("code", sa.String(30), nullable=False, unique=True),
+        sa.Column("semester", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "time_details",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("group_name", sa.String(50), nullable=False),
+        sa.Column("room", sa.String(50), nullable=False),
+        sa.Column("time", sa.Time(), nullable=False),
+    )
+    op.create_table(
+        "professor_courses",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("professor_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.UniqueConstraint("professor_id", "course_id", name="uq_professor_course"),
+    )
+    op.create_table(
+        "course_assignments",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("time_details_id", sa.Integer(), sa.ForeignKey("time_details.id", ondelete="CASCADE"),
+                  nullable=False),
+    )
+    op.create_table(
+        "laboratory_exercises",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("date_time", sa.DateTime(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "student_points",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("lab_exercise_id", sa.Integer(), sa.ForeignKey("laboratory_exercises.id", ondelete="CASCADE"),
+                  nullable=False),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("student_points")
+    op.drop_table("laboratory_exercises")
+    op.drop_table("course_assignments")
+    op.drop_table("professor_courses")
+    op.drop_table("time_details")
+    op.drop_table("courses")
+    op.drop_table("users")
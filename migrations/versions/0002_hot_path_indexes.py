@@ -0,0 +1,47 @@
+"""hot path indexes and uniqueness
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the most recent grade and the earliest enrollment for every duplicated pair.
+    op.execute(
+        "DELETE FROM student_points WHERE id NOT IN "
+        "(SELECT MAX(id) FROM student_points GROUP BY lab_exercise_id, student_id)"
+    )
+    op.execute(
+        "DELETE FROM course_assignments WHERE id NOT IN "
+        "(SELECT MIN(id) FROM course_assignments GROUP BY course_id, student_id)"
+    )
+
+    with op.batch_alter_table("student_points") as batch_op:
+        batch_op.create_unique_constraint("uq_student_points_lab_exercise_student", ["lab_exercise_id", "student_id"])
+    with op.batch_alter_table("course_assignments") as batch_op:
+        batch_op.create_unique_constraint("uq_course_assignments_course_student", ["course_id", "student_id"])
+
+    op.create_index("ix_laboratory_exercises_course_id", "laboratory_exercises", ["course_id"])
+    op.create_index("ix_users_role", "users", ["role"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_role", table_name="users")
+    op.drop_index("ix_laboratory_exercises_course_id", table_name="laboratory_exercises")
+
+    with op.batch_alter_table("course_assignments") as batch_op:
+        batch_op.drop_constraint("uq_course_assignments_course_student", type_="unique")
+    with op.batch_alter_table("student_points") as batch_op:
+        batch_op.drop_constraint("uq_student_points_lab_exercise_student", type_="unique")
@@ -0,0 +1,44 @@
+"""list filter indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOWER_PREFIX_INDEXES = [
+    ("ix_courses_name_lower", "courses", "name"),
+    ("ix_courses_code_lower", "courses", "code"),
+    ("ix_users_username_lower", "users", "username"),
+    ("ix_users_name_lower", "users", "name"),
+    ("ix_users_surname_lower", "users", "surname"),
+]
+
+
+def upgrade() -> None:
+    op.create_index("ix_courses_semester_id", "courses", ["semester", "id"])
+
+    # text_pattern_ops lets Postgres serve LIKE 'prefix%' from the index regardless of collation.
+    for index_name, table_name, column_name in LOWER_PREFIX_INDEXES:
+        if op.get_bind().dialect.name == "postgresql":
+            op.execute(f"CREATE INDEX {index_name} ON {table_name} (lower({column_name}) text_pattern_ops)")
+        else:
+            op.create_index(index_name, table_name, [sa.text(f"lower({column_name})")])
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in reversed(LOWER_PREFIX_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+
+    op.drop_index("ix_courses_semester_id", table_name="courses")
@@ -0,0 +1,43 @@
+"""student course totals
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "student_course_totals",
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("earned_points", sa.Integer(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+        sa.Column("graded_count", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_student_course_totals_course_earned", "student_course_totals",
+                    ["course_id", "earned_points"])
+
+    op.execute(
+        "INSERT INTO student_course_totals (student_id, course_id, earned_points, max_points, graded_count) "
+        "SELECT sp.student_id, le.course_id, SUM(sp.points), SUM(le.max_points), COUNT(sp.id) "
+        "FROM student_points sp JOIN laboratory_exercises le ON le.id = sp.lab_exercise_id "
+        "GROUP BY sp.student_id, le.course_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_student_course_totals_course_earned", table_name="student_course_totals")
+    op.drop_table("student_course_totals")
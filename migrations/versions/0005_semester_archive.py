@@ -0,0 +1,77 @@
+"""semester archive tables
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COURSE_LOWER_INDEXES = [
+    ("ix_courses_name_lower", "name"),
+    ("ix_courses_code_lower", "code"),
+]
+
+
+def upgrade() -> None:
+    op.add_column("courses", sa.Column("archived_at", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "archived_laboratory_exercises",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("date_time", sa.DateTime(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_archived_laboratory_exercises_course_id", "archived_laboratory_exercises", ["course_id"])
+
+    op.create_table(
+        "archived_course_assignments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("time_details_id", sa.Integer(), sa.ForeignKey("time_details.id", ondelete="CASCADE"),
+                  nullable=False),
+    )
+    op.create_index("ix_archived_course_assignments_student_id", "archived_course_assignments", ["student_id"])
+    op.create_index("ix_archived_course_assignments_course_id", "archived_course_assignments", ["course_id"])
+
+    op.create_table(
+        "archived_student_points",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("lab_exercise_id", sa.Integer(),
+                  sa.ForeignKey("archived_laboratory_exercises.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_archived_student_points_lab_exercise_student", "archived_student_points",
+                    ["lab_exercise_id", "student_id"])
+    op.create_index("ix_archived_student_points_student", "archived_student_points", ["student_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("archived_student_points")
+    op.drop_table("archived_course_assignments")
+    op.drop_table("archived_laboratory_exercises")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_column("courses", "archived_at")
+        return
+
+    # Batch mode rebuilds courses on SQLite and does not carry over the lower() expression indexes from 0003.
+    for index_name, _ in COURSE_LOWER_INDEXES:
+        op.drop_index(index_name, table_name="courses")
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("archived_at")
+    for index_name, column_name in COURSE_LOWER_INDEXES:
+        op.create_index(index_name, "courses", [sa.text(f"lower({column_name})")])
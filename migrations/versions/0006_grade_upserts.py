@@ -0,0 +1,42 @@
+"""grade timestamps and idempotency keys
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("student_points", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.add_column("archived_student_points", sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("key", sa.String(length=100), primary_key=True),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
+    with op.batch_alter_table("archived_student_points") as batch_op:
+        batch_op.drop_column("updated_at")
+    with op.batch_alter_table("student_points") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,25 @@
+"""course assignments by student index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 20:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_course_assignments_student_id", "course_assignments", ["student_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_course_assignments_student_id", table_name="course_assignments")
@@ -0,0 +1,47 @@
+"""never reuse ids of archived rows
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 22:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVED_TABLES = [
+    ("laboratory_exercises", "archived_laboratory_exercises"),
+    ("course_assignments", "archived_course_assignments"),
+    ("student_points", "archived_student_points"),
+]
+
+
+def upgrade() -> None:
+    # Postgres sequences never hand out an id twice; SQLite only guarantees that with AUTOINCREMENT.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table_name, archive_table_name in ARCHIVED_TABLES:
+        with op.batch_alter_table(table_name, recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+            pass
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table_name}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table_name}', COALESCE(MAX(id), 0) FROM "
+            f"(SELECT MAX(id) AS id FROM {table_name} UNION ALL SELECT MAX(id) FROM {archive_table_name})"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table_name, _ in reversed(ARCHIVED_TABLES):
+        with op.batch_alter_table(table_name, recreate="always"):
+            pass